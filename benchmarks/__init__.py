@@ -0,0 +1,4 @@
+"""
+Seeded problem generators and runner which times parsing, CNF conversion and proving
+Run from folder of main.py: python3 -m benchmarks.runner
+"""
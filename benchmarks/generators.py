@@ -0,0 +1,132 @@
+import random
+
+# clause to symbol ratio where random 3-CNF is hardest
+PHASE_TRANSITION_RATIO = 4.26
+
+
+def create_problem(formulas, query, options=""):
+    # problem in input format, list of lines: header, formulas and query
+    header = f"{len(formulas)} 0 {options}".strip()
+    return [header] + formulas + [query]
+
+
+def random_3cnf(size, seed, options=""):
+    # size symbols and clauses near phase transition, query is negation of last clause
+    # so query is true if and only if all clauses together are unsatisfiable
+    rng = random.Random(seed)
+    symbols = [f"X{i}" for i in range(1, size + 1)]
+    num_of_clauses = max(2, round(size * PHASE_TRANSITION_RATIO))
+
+    clauses = []
+    for _ in range(num_of_clauses):
+        literals = [("!" if rng.random() < 0.5 else "") + x for x in rng.sample(symbols, min(3, size))]
+        clauses.append("|".join(literals))
+
+    return create_problem(clauses[:-1], f"!({clauses[-1]})", options)
+
+
+def pigeonhole(size, seed, options=""):
+    # size+1 pigeons and size holes, knowledge base puts every pigeon except first in a hole
+    # query says first pigeon has no hole, which is true as every hole is already full
+    # seed only shuffles order of formulas
+    rng = random.Random(seed)
+    holes = range(1, size + 1)
+    pigeons = range(1, size + 2)
+
+    formulas = []
+    for p in pigeons[1:]:
+        formulas.append("|".join(f"P{p}_{h}" for h in holes))
+    for h in holes:
+        for p in pigeons:
+            for q in pigeons[p:]:
+                formulas.append(f"!P{p}_{h}|!P{q}_{h}")
+    rng.shuffle(formulas)
+
+    query = "!(" + "|".join(f"P1_{h}" for h in holes) + ")"
+    return create_problem(formulas, query, options)
+
+
+def implication_chain(size, seed, options=""):
+    # A0 and A0>A1, A1>A2, ... in random order, query is last symbol of chain
+    # every symbol of chain also implies a dead end symbol, so prover has to choose right branch
+    rng = random.Random(seed)
+    formulas = ["A0"]
+    for i in range(size):
+        formulas.append(f"A{i}>A{i + 1}")
+        formulas.append(f"A{i}>D{i}")
+    rng.shuffle(formulas)
+    return create_problem(formulas, f"A{size}", options)
+
+
+def horn(size, seed, options=""):
+    # size random rules with one to three symbols in body like A&B>C and few facts
+    # query is random symbol, it may or may not follow from knowledge base
+    rng = random.Random(seed)
+    symbols = [f"H{i}" for i in range(max(4, size // 2))]
+
+    formulas = rng.sample(symbols, max(1, len(symbols) // 10))
+    for _ in range(size):
+        body = rng.sample(symbols, rng.randint(1, 3))
+        head = rng.choice(symbols)
+        formulas.append(f"{'&'.join(body)}>{head}")
+    rng.shuffle(formulas)
+
+    return create_problem(formulas, rng.choice(symbols), options)
+
+
+def nested_iff(size, seed, options=""):
+    # X1=(X2=(X3=...)) with value of every symbol except one given as fact
+    # value of last symbol follows from parity, classic CNF of nested biconditional is exponential in size
+    rng = random.Random(seed)
+    symbols = [f"X{i}" for i in range(1, size + 1)]
+    rng.shuffle(symbols)
+
+    formula = symbols[-1]
+    for x in reversed(symbols[:-1]):
+        formula = f"{x}=({formula})"
+
+    # a=b is true when a XOR b is false, so nested formula is true when parity of false symbols is even
+    formulas = [formula]
+    is_false = False
+    for x in symbols[1:]:
+        value = rng.random() < 0.5
+        formulas.append(x if value else f"!{x}")
+        is_false ^= not value
+
+    query = f"!{symbols[0]}" if is_false else symbols[0]
+    return create_problem(formulas, query, options)
+
+
+def small_formulas(size, seed, options=""):
+    # size short random rules like (A|!B)>C over few symbols, many of them share sub formulas
+    # time goes mostly to parsing and creating formula nodes, query is random symbol
+    rng = random.Random(seed)
+    symbols = [f"S{i}" for i in range(20)]
+
+    def literal():
+        return ("!" if rng.random() < 0.5 else "") + rng.choice(symbols)
+
+    formulas = []
+    for _ in range(size):
+        left = f"{literal()}{rng.choice('&|')}{literal()}"
+        formulas.append(f"({left}){rng.choice('>=')}{literal()}")
+
+    return create_problem(formulas, rng.choice(symbols), options)
+
+
+# family name -> (generator, default sizes)
+FAMILIES = {
+    "random_3cnf": (random_3cnf, [10, 20, 30]),
+    "pigeonhole": (pigeonhole, [2, 3, 4]),
+    "implication_chain": (implication_chain, [100, 1000, 5000]),
+    "horn": (horn, [100, 1000, 5000]),
+    "nested_iff": (nested_iff, [4, 8, 12]),
+    "small_formulas": (small_formulas, [1000, 10000, 20000]),
+}
+
+
+def generate(family, size, seed, options=""):
+    if family not in FAMILIES:
+        raise Exception(f"Benchmark Error: unknown family {family}")
+    generator, _ = FAMILIES[family]
+    return generator(size, seed, options)
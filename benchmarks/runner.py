@@ -0,0 +1,177 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from pl_parser import FormulaParser, Parser
+from pl_logic import KnowledgeBase, PLLogicProblem
+from benchmarks.generators import FAMILIES, generate
+
+PHASES = ["parse", "cnf", "prove"]
+# phases faster than this (seconds) are too noisy to compare
+MIN_COMPARED_TIME = 0.001
+
+
+def solve_in_phases(problem):
+    # solve problem like Parser does, returns solved problem and time of each phase
+    # parse: formulas and query to trees, cnf: knowledge base to CNF and compiled clauses
+    # prove: negation of query to CNF and proof
+    header = problem[0].split()
+    mode = int(header[1])
+    options = dict(Parser.OPTIONS[word] for word in header[2:])
+    cnf = options.pop("cnf", "classic")
+
+    times = {}
+    start = time.perf_counter()
+    formulas = [FormulaParser(x) for x in problem[1:-1]]
+    query = FormulaParser(problem[-1])
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    knowledge_base = KnowledgeBase(formulas, cnf)
+    times["cnf"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pl_problem = PLLogicProblem(knowledge_base, query, mode, **options)
+    times["prove"] = time.perf_counter() - start
+    return pl_problem, times
+
+
+def run_benchmark(family, size, seed, options="", repeat=3):
+    # best time of each phase over repeats, every run starts after nodes of earlier runs are freed,
+    # so it creates all its formula nodes again instead of finding them in intern table
+    problem = generate(family, size, seed, options)
+
+    # peak memory is measured in one extra run before timed ones, as tracing memory slows down every allocation
+    gc.collect()
+    tracemalloc.start()
+    try:
+        solve_in_phases(problem)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = {}
+    ret = None
+    for _ in range(repeat):
+        gc.collect()
+        pl_problem, times = solve_in_phases(problem)
+        for phase in PHASES:
+            best[phase] = min(best.get(phase, times[phase]), times[phase])
+        ret = {
+            "family": family,
+            "size": size,
+            "seed": seed,
+            "options": options,
+            "formulas": len(problem) - 2,
+            "clauses": len(pl_problem.compiled_knowledge_base.clauses),
+            "steps": len(pl_problem.steps_to_prove),
+            "result": "unknown" if pl_problem.is_query_true is None else int(pl_problem.is_query_true),
+            "times": best,
+            "total_time": sum(best.values()),
+            "peak_memory": peak_memory,
+            "counters": pl_problem.stats.counters,
+        }
+        del pl_problem
+    return ret
+
+
+def environment():
+    # where results come from, so results of different machines are not mixed up by mistake
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def key_of(result):
+    return result["family"], result["size"], result["seed"], result["options"]
+
+
+def compare(baseline, current, threshold):
+    # returns lines of report and number of regressions, phase is regression if it is slower by threshold
+    baseline_results = {key_of(x): x for x in baseline["results"]}
+    lines = []
+    regressions = 0
+    for result in current["results"]:
+        old = baseline_results.get(key_of(result))
+        name = f"{result['family']}/{result['size']} {result['options']}".strip()
+        if old is None:
+            lines.append(f"{name}: no baseline")
+            continue
+        if old["result"] != result["result"]:
+            regressions += 1
+            lines.append(f"{name}: RESULT CHANGED {old['result']} -> {result['result']}")
+
+        for phase in PHASES + ["total"]:
+            old_time = old["total_time"] if phase == "total" else old["times"][phase]
+            new_time = result["total_time"] if phase == "total" else result["times"][phase]
+            if max(old_time, new_time) < MIN_COMPARED_TIME:
+                continue
+            ratio = new_time / old_time if old_time else float("inf")
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = " REGRESSION"
+                regressions += 1
+            lines.append(f"{name} {phase}: {old_time:.4f}s -> {new_time:.4f}s ({ratio:.2f}x){flag}")
+
+        memory_ratio = result["peak_memory"] / old["peak_memory"] if old["peak_memory"] else 1
+        lines.append(f"{name} memory: {old['peak_memory']} -> {result['peak_memory']} bytes ({memory_ratio:.2f}x)")
+    return lines, regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmarks of propositional logic theorem prover")
+    arg_parser.add_argument("-f", "--family", action="append", choices=sorted(FAMILIES),
+                            help="family of problems, can be given many times (default: all)")
+    arg_parser.add_argument("-s", "--size", type=int, action="append",
+                            help="size of problems, can be given many times (default: sizes of family)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="seed of generated problems")
+    arg_parser.add_argument("-o", "--options", default="", help="options of problems, eg. 'tseitin sat'")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="number of timed runs, best one is kept")
+    arg_parser.add_argument("--output", help="file to write results as JSON (default: standard output)")
+    arg_parser.add_argument("--compare", metavar="BASELINE", help="JSON results to compare with")
+    arg_parser.add_argument("--threshold", type=float, default=0.2,
+                            help="relative slowdown which is reported as regression (default: 0.2)")
+    args = arg_parser.parse_args(argv)
+
+    results = []
+    for family in args.family or list(FAMILIES):
+        for size in args.size or FAMILIES[family][1]:
+            result = run_benchmark(family, size, args.seed, args.options, args.repeat)
+            results.append(result)
+            print(f"{family}/{size}: {result['total_time']:.4f}s, {result['peak_memory']} bytes", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(baseline, report, args.threshold)
+        print("\n".join(lines))
+        print(f"{regressions} regression(s)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
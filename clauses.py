@@ -0,0 +1,206 @@
+from operations import UnaryOperation, Operand, create_clause_with_given_symbol
+
+
+class SymbolTable(object):
+    """
+    Interns symbol names to positive integers, a negated symbol is stored as negative integer
+    """
+    ids = None
+    names = None
+
+    def __init__(self):
+        self.ids = {}
+        # index 0 is never used because 0 can not be negated
+        self.names = [None]
+
+    def __len__(self):
+        return len(self.names) - 1
+
+    def intern(self, name):
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self.names)
+            self.ids[name] = symbol_id
+            self.names.append(name)
+        return symbol_id
+
+    def literal(self, formula):
+        # case A
+        if type(formula) is Operand:
+            return self.intern(formula.value)
+
+        # case !A
+        if type(formula) is UnaryOperation and formula.operator == "!" and type(formula.operand) is Operand:
+            return -self.intern(formula.operand.value)
+
+        raise Exception(f"Compilation Error: {formula} is not a literal")
+
+    def name(self, symbol_id):
+        return self.names[symbol_id]
+
+    def formula(self, literal):
+        operand = Operand(self.name(abs(literal)))
+        if literal < 0:
+            return UnaryOperation("!", operand)
+        return operand
+
+    def overlay(self):
+        return SymbolOverlay(self)
+
+
+class SymbolOverlay(SymbolTable):
+    """
+    Symbol table on top of another one, symbols which base does not have are interned only to overlay
+    Query is compiled with overlay, so queries do not grow symbol table of knowledge base
+    """
+    base = None
+    # ids of overlay symbols start after last id which base had when overlay was created
+    offset = None
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+        self.offset = len(base)
+
+    def __len__(self):
+        return self.offset + len(self.names) - 1
+
+    def intern(self, name):
+        symbol_id = self.base.ids.get(name)
+        if symbol_id is not None and symbol_id <= self.offset:
+            return symbol_id
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.offset + len(self.names)
+            self.ids[name] = symbol_id
+            self.names.append(name)
+        return symbol_id
+
+    def name(self, symbol_id):
+        if symbol_id <= self.offset:
+            return self.base.name(symbol_id)
+        return self.names[symbol_id - self.offset]
+
+
+class Clause(object):
+    """
+    Disjunction of literals compiled to signed integers
+    literals keeps order of appearance (used to print clause) and literal_set is used for comparison
+    """
+    literals = None
+    literal_set = None
+    signature = None
+    symbols = None
+
+    def __init__(self, literals, symbols):
+        self.literals = tuple(literals)
+        self.literal_set = frozenset(self.literals)
+        self.symbols = symbols
+
+        # bitmask of literals, if bits of a clause are not subset of other then clause is not subset of it
+        self.signature = 0
+        for literal in self.literals:
+            self.signature |= 1 << ((2 * abs(literal) + (literal < 0)) % 64)
+
+    def __eq__(self, other):
+        if type(other) is not Clause:
+            return False
+        return self.literal_set == other.literal_set
+
+    def __hash__(self):
+        return hash(self.literal_set)
+
+    def __len__(self):
+        return len(self.literals)
+
+    def __str__(self):
+        return str(self.to_formula())
+
+    def __repr__(self):
+        return str(self)
+
+    def subsumes(self, other):
+        # A subsumes A|B, every literal of clause appears in other clause
+        if self.signature & ~other.signature:
+            return False
+        return len(self.literals) <= len(other.literals) and self.literal_set <= other.literal_set
+
+    def to_formula(self):
+        # rebuild operation tree, only required to print clause
+        return create_clause_with_given_symbol([self.symbols.formula(x) for x in self.literals], "|")
+
+    @staticmethod
+    def compile(formula, symbols):
+        # formula must be optimized disjunction of literals
+        literals = formula.segregate("|")
+
+        ret = []
+        for literal in literals:
+            literal = symbols.literal(literal)
+            if literal not in ret:
+                ret.append(literal)
+        return Clause(ret, symbols)
+
+
+def renumber(clauses):
+    # returns literals of clauses with symbols numbered from 1 in order of appearance and number of symbols
+    # solver which allocates every symbol then costs only symbols of given clauses
+    ids = {}
+    ret = []
+    for literals in clauses:
+        clause = []
+        for literal in literals:
+            symbol = ids.setdefault(abs(literal), len(ids) + 1)
+            clause.append(symbol if literal > 0 else -symbol)
+        ret.append(clause)
+    return ret, len(ids)
+
+
+class ClauseIndex(object):
+    """
+    Maps each literal to clauses which contain its complement, so resolution partners are found without scanning
+    """
+    clauses = None
+    complements = None
+
+    def __init__(self):
+        # dict is used as ordered set
+        self.clauses = {}
+        # literal -> clauses
+        self.complements = {}
+
+    def __contains__(self, clause):
+        return clause in self.clauses
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def add(self, clause):
+        self.clauses[clause] = None
+        for literal in clause.literals:
+            self.complements.setdefault(-literal, {})[clause] = None
+
+    def remove(self, clause):
+        del self.clauses[clause]
+        for literal in clause.literals:
+            del self.complements[-literal][clause]
+
+    def find_subsuming(self, clause):
+        # clause which subsumes given clause must contain at least one literal of it
+        for literal in clause.literals:
+            for other in self.complements.get(-literal, {}):
+                if other.subsumes(clause):
+                    return other
+        return None
+
+    def find_subsumed(self, clause):
+        # clause subsumed by given clause must contain every literal of it, check the least frequent one
+        occurrences = min((self.complements.get(-x, {}) for x in clause.literals), key=len)
+        return [other for other in occurrences if other is not clause and clause.subsumes(other)]
+
+    def resolvable_with(self, clause):
+        # every clause which has at least one complementary literal of given clause
+        partners = {}
+        for literal in clause.literals:
+            partners.update(self.complements.get(literal, {}))
+        return list(partners)
@@ -0,0 +1,200 @@
+from operations import BinaryOperation, UnaryOperation, Operand, create_clause_with_given_symbol, negate
+
+
+class CNFConverter(object):
+    """
+    Converts formula to CNF (classic form) by pushing NOT to symbols and distributing OR over AND
+    Both steps are done in one traversal with explicit stack, so depth of formula is not limited
+    Clauses of sub formula are kept only till every formula which uses it is converted
+    """
+    # (formula, is positive) -> clauses of formula (or its negation), set of literals -> clause as tuple of literals
+    converted = None
+
+    def __init__(self):
+        self.converted = {}
+
+    def convert(self, formula):
+        clauses = self._clauses(formula, True)
+        return create_clause_with_given_symbol([create_clause_with_given_symbol(list(x), "|") for x in clauses], "&")
+
+    def _clauses(self, formula, positive):
+        root = (formula, positive)
+        converted = self.converted = {}
+        plans, uses = self._plans(root)
+
+        stack = [root]
+        while stack:
+            item = stack[-1]
+            if item in converted:
+                stack.pop()
+                continue
+
+            # convert every sub formula used by plan first
+            plan, items = plans[item]
+            pending = [x for x in items if x not in converted]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            converted[item] = self._evaluate(plan)
+            stack.pop()
+
+            # clauses of shared sub formula are kept for its other formulas, other clauses are dropped
+            for x in items:
+                uses[x] -= 1
+                if not uses[x]:
+                    del converted[x]
+
+        return list(converted[root].values())
+
+    def _plans(self, root):
+        # plan and items of every sub formula reachable from root and number of plans which use each item
+        # literals are converted at once
+        converted = self.converted
+        plans = {}
+        uses = {root: 1}
+        stack = [root]
+        while stack:
+            item = stack.pop()
+            if item in plans or item in converted:
+                continue
+            f, is_positive = item
+            if type(f) is Operand or (type(f) is UnaryOperation and type(f.operand) is Operand):
+                literal = f if is_positive else negate(f)
+                converted[item] = {frozenset([literal]): (literal,)}
+                continue
+
+            plan = self._expand(f, is_positive)
+            items = self._items(plan)
+            plans[item] = plan, items
+            for x in items:
+                uses[x] = uses.get(x, 0) + 1
+                stack.append(x)
+        return plans, uses
+
+    @staticmethod
+    def _operator(f, positive):
+        # operator of formula (or its negation) in NNF, None for IFF and symbol
+        while type(f) is UnaryOperation:
+            f, positive = f.operand, not positive
+        if type(f) is Operand or f.operator == "=":
+            return None
+        if f.operator == "&":
+            return "&" if positive else "|"
+        # A|B and A>B = !A|B
+        return "|" if positive else "&"
+
+    @staticmethod
+    def _operands(f, positive):
+        # operands of formula (or its negation) in NNF with their sign
+        while type(f) is UnaryOperation:
+            f, positive = f.operand, not positive
+        if type(f) is not BinaryOperation:
+            # !(A&B&C) = !A|!B|!C and !(A|B|C) = !A&!B&!C
+            return [(x, positive) for x in f.operands]
+        # A>B = !A|B and !(A>B) = A&!B
+        return [(f.left_operand, not positive), (f.right_operand, positive)]
+
+    def _expand(self, f, positive):
+        # NNF of formula (or its negation) as ("&" or "|", parts), part is a plan or (sub formula, is positive)
+        if type(f) is UnaryOperation and type(f.operand) is not Operand:
+            return "&", [(f.operand, not positive)]
+
+        if type(f) is BinaryOperation and f.operator == "=":
+            a, b = f.left_operand, f.right_operand
+            # A=B = (!A|B)&(A|!B) and !(A=B) = (A|B)&(!A|!B)
+            if positive:
+                return "&", [("|", [(a, False), (b, True)]), ("|", [(a, True), (b, False)])]
+            return "&", [("|", [(a, True), (b, True)]), ("|", [(a, False), (b, False)])]
+
+        # operands with same operator are collected together, so chain like A1&A2&...&An is converted at once
+        operator = self._operator(f, positive)
+        if operator is None:
+            raise Exception(f"Conversion Error: unknown formula {f}")
+
+        parts = []
+        stack = [(f, positive)]
+        while stack:
+            g, is_positive = stack.pop()
+            if self._operator(g, is_positive) == operator:
+                stack.extend(reversed(self._operands(g, is_positive)))
+            else:
+                parts.append((g, is_positive))
+        return operator, parts
+
+    @staticmethod
+    def _is_item(part):
+        # plan starts with operator, item with formula
+        return type(part[0]) is not str
+
+    def _items(self, plan):
+        ret = []
+        for part in plan[1]:
+            if self._is_item(part):
+                ret.append(part)
+            else:
+                ret += self._items(part)
+        return ret
+
+    def _evaluate(self, plan):
+        operator, parts = plan
+        results = [self.converted[x] if self._is_item(x) else self._evaluate(x) for x in parts]
+
+        if operator == "&":
+            return self._conjunction(x.items() for x in results)
+
+        # one of the operands is tautology
+        if not all(results):
+            return {}
+
+        # operands with single clause are joined at once
+        literals = []
+        for clauses in results:
+            if len(clauses) == 1:
+                literals += next(iter(clauses.values()))
+        ret = self._conjunction([[self._clause(literals)]])
+
+        # distribute OR over AND, (A&B)|(C&D) = (A|C)&(A|D)&(B|C)&(B|D)
+        for clauses in results:
+            if len(clauses) > 1:
+                ret = self._conjunction([[self._disjunction(x, y) for x in ret.items() for y in clauses.items()]])
+        return ret
+
+    @staticmethod
+    def _conjunction(results):
+        # clauses are (set of literals, clause) pairs, duplicate clauses and tautologies (None) are removed
+        # clauses are stored with sets of their literals, so long clauses are joined without hashing every literal
+        ret = {}
+        for clauses in results:
+            for x in clauses:
+                if x is not None:
+                    ret.setdefault(*x)
+        return ret
+
+    @staticmethod
+    def _clause(literals):
+        # clause of literals without duplicates, returns None if it is tautology
+        seen = set()
+        ret = []
+        for literal in literals:
+            if negate(literal) in seen:
+                return None
+            if literal not in seen:
+                seen.add(literal)
+                ret.append(literal)
+        return frozenset(seen), tuple(ret)
+
+    @staticmethod
+    def _disjunction(x, y):
+        # returns None if disjunction is tautology
+        # clauses are not tautologies, so only literals of shorter clause are negated
+        literals1, clause1 = x
+        literals2, clause2 = y
+        if len(clause1) <= len(clause2):
+            if any(negate(x) in literals2 for x in clause1):
+                return None
+        elif any(negate(x) in literals1 for x in clause2):
+            return None
+        if literals1.isdisjoint(literals2):
+            return literals1 | literals2, clause1 + clause2
+        return literals1 | literals2, clause1 + tuple(x for x in clause2 if x not in literals1)
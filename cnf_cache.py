@@ -0,0 +1,168 @@
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from pl_logic import KnowledgeBase
+
+
+class CNFCache(object):
+    """
+    On disk cache of compiled knowledge bases, file name is hash of formulas and CNF conversion
+    File has header, symbol names and clauses as arrays of integers, it is read through mmap
+    Least recently used files are removed when size of cache is larger than max_size, size is checked after every
+    store and on first load, so cache which was filled with larger max_size shrinks even if nothing is stored
+    """
+    # version is part of key, so files of older format are never read
+    VERSION = 1
+    MAGIC = b"PLCNF"
+    # magic, byte order, version, tseitin count, symbols, clauses, literals, formulas, indexes, size of names
+    HEADER = struct.Struct("<5sBH7Q")
+    SUFFIX = ".cnf"
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+    directory = None
+    max_size = None
+    is_evicted = None
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.is_evicted = False
+
+    @classmethod
+    def key(cls, formulas, cnf):
+        # formulas are normalized like in Parser, white spaces do not change key
+        text = "\n".join("".join(formula.split()) for formula in formulas)
+        return hashlib.sha256(f"{cls.VERSION}\n{cnf}\n{text}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def load(self, key, num_of_formulas, cnf, parse):
+        # returns KnowledgeBase or None if it is not in cache, parse is function which returns parsed formulas
+        path = self.path(key)
+        ret = None
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    ret = self._read(data, num_of_formulas, cnf, parse)
+            # file is used, so it is evicted later
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError):
+            # damaged or incomplete file is removed and compiled again
+            ret = None
+            self._remove(path)
+        if not self.is_evicted:
+            self._evict()
+        return ret
+
+    def store(self, key, knowledge_base):
+        os.makedirs(self.directory, exist_ok=True)
+        data = self._write(knowledge_base)
+
+        # file is written under temporary name first, so other process never reads incomplete file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self.path(key))
+        except OSError:
+            self._remove(temp_path)
+            raise
+        self._evict()
+
+    @classmethod
+    def _write(cls, knowledge_base):
+        names = "\n".join(knowledge_base.symbols.names[1:]).encode()
+        lengths = array.array("q", [len(x) for x in knowledge_base.clauses])
+        literals = array.array("q", [literal for x in knowledge_base.clauses for literal in x.literals])
+        counts = array.array("q", [len(x) for x in knowledge_base.formula_clauses])
+        indexes = array.array("q", [i for x in knowledge_base.formula_clauses for i in x])
+        count = knowledge_base.converter.count if knowledge_base.converter else 0
+
+        header = cls.HEADER.pack(cls.MAGIC, sys.byteorder == "little", cls.VERSION, count,
+                                 len(knowledge_base.symbols), len(lengths), len(literals), len(counts), len(indexes),
+                                 len(names))
+        # arrays are aligned to 8 bytes, so they can be read from mmap without copying
+        names += b"\0" * (-(len(header) + len(names)) % 8)
+        return b"".join([header, names, lengths.tobytes(), literals.tobytes(), counts.tobytes(), indexes.tobytes()])
+
+    @classmethod
+    def _read(cls, data, expected_formulas, cnf, parse):
+        magic, is_little, version, count, num_of_symbols, num_of_clauses, num_of_literals, num_of_formulas, \
+            num_of_indexes, names_size = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION or is_little != (sys.byteorder == "little"):
+            raise ValueError("unknown format of cache file")
+        if num_of_formulas != expected_formulas:
+            raise ValueError("cache file has different number of formulas")
+
+        offset = cls.HEADER.size
+        names = bytes(data[offset:offset + names_size]).decode().split("\n") if num_of_symbols else []
+        if len(names) != num_of_symbols:
+            raise ValueError("cache file has different number of symbols")
+        offset += names_size + (-(offset + names_size) % 8)
+
+        view = memoryview(data)
+        arrays = []
+        try:
+            for size in [num_of_clauses, num_of_literals, num_of_formulas, num_of_indexes]:
+                if offset + size * 8 > len(data):
+                    raise ValueError("cache file is incomplete")
+                arrays.append(view[offset:offset + size * 8].cast("q"))
+                offset += size * 8
+            lengths, literals, counts, indexes = arrays
+
+            clauses = []
+            start = 0
+            for length in lengths:
+                clauses.append(tuple(literals[start:start + length]))
+                start += length
+            formula_clauses = []
+            start = 0
+            for length in counts:
+                formula_clauses.append(list(indexes[start:start + length]))
+                start += length
+        finally:
+            # every view must be released before mmap is closed
+            for x in arrays:
+                x.release()
+            view.release()
+
+        return KnowledgeBase.restore(parse, cnf, names, clauses, formula_clauses, count)
+
+    def _evict(self):
+        # remove least recently used files till cache fits in max_size
+        self.is_evicted = True
+        files = []
+        total = 0
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+            total += stat.st_size
+
+        files.sort()
+        for _, path, size in files:
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,112 @@
+class HornSolver(object):
+    """
+    Satisfiability of Horn clauses (at most one positive literal) by forward chaining in time linear in their size
+    Every clause counts its body atoms which are not true yet, when count reaches zero its head becomes true
+    Clauses are unsatisfiable when count of clause without head reaches zero
+    Clauses given to constructor are saturated once, clauses given to solve are added only till reset is called
+    """
+    clauses = None
+    # number of false body atoms and head (None for clause without head) of every clause
+    counts = None
+    heads = None
+    # atom -> indexes of clauses which have atom in body
+    bodies = None
+    # atom -> index of clause which made it true, in order in which atoms became true
+    reasons = None
+    # index of clause whose every literal is false, None if clauses are satisfiable
+    conflict = None
+
+    # state after constructor, solve changes are undone by reset
+    num_of_clauses = None
+    num_of_facts = None
+    base_conflict = None
+    decremented = None
+    watched = None
+
+    def __init__(self, clauses):
+        # clauses: lists of signed integer literals, literals of clause must be unique
+        self.clauses = []
+        self.counts = []
+        self.heads = []
+        self.bodies = {}
+        self.reasons = {}
+        self.decremented = []
+        self.watched = []
+
+        self._propagate(self._add(clauses))
+        self.num_of_clauses = len(self.clauses)
+        self.num_of_facts = len(self.reasons)
+        self.base_conflict = self.conflict
+        self.decremented = []
+        self.watched = []
+
+    @staticmethod
+    def is_horn(clauses):
+        return all(sum(1 for literal in literals if literal > 0) <= 1 for literals in clauses)
+
+    def solve(self, clauses=()):
+        # returns True if clauses of constructor together with given clauses are satisfiable
+        # reasons and conflict can be read till reset is called
+        if self.conflict is None:
+            self._propagate(self._add(clauses))
+        return self.conflict is None
+
+    def reset(self):
+        # forget clauses given to solve and everything derived from them
+        for i in self.decremented:
+            self.counts[i] += 1
+        for atom in reversed(self.watched):
+            self.bodies[atom].pop()
+        del self.clauses[self.num_of_clauses:]
+        del self.counts[self.num_of_clauses:]
+        del self.heads[self.num_of_clauses:]
+        while len(self.reasons) > self.num_of_facts:
+            self.reasons.popitem()
+        self.conflict = self.base_conflict
+        self.decremented = []
+        self.watched = []
+
+    def _add(self, clauses):
+        # returns atoms which became true, body atoms which are already true are not counted
+        queue = []
+        for literals in clauses:
+            i = len(self.clauses)
+            self.clauses.append(literals)
+            head = None
+            count = 0
+            for literal in literals:
+                if literal > 0:
+                    head = literal
+                elif -literal not in self.reasons:
+                    count += 1
+                    self.bodies.setdefault(-literal, []).append(i)
+                    self.watched.append(-literal)
+            self.counts.append(count)
+            self.heads.append(head)
+
+            # fact or clause without head whose body is already true
+            if count == 0:
+                if head is None:
+                    self.conflict = i
+                    return []
+                if head not in self.reasons:
+                    self.reasons[head] = i
+                    queue.append(head)
+        return queue
+
+    def _propagate(self, queue):
+        counts = self.counts
+        while queue:
+            atom = queue.pop()
+            for i in self.bodies.get(atom, []):
+                counts[i] -= 1
+                self.decremented.append(i)
+                if counts[i]:
+                    continue
+                head = self.heads[i]
+                if head is None:
+                    self.conflict = i
+                    return
+                if head not in self.reasons:
+                    self.reasons[head] = i
+                    queue.append(head)
@@ -0,0 +1,159 @@
+from pl_logic import KnowledgeBase, Pair
+from pl_parser import FormulaParser
+
+
+class IncrementalKnowledgeBase(KnowledgeBase):
+    """
+    Knowledge base which can be changed between queries with tell and retract
+    Unit resolution of knowledge base clauses is kept between queries, every resolvent remembers pair it is made of,
+    so retracting a formula removes only resolvents which depend on clauses of that formula
+    """
+    # literal -> unit clause of knowledge base or resolvent
+    units = None
+    # clause of knowledge base -> pairs which resolved it with units one by one, and its last resolvent (head)
+    chains = None
+    heads = None
+    # literal -> clauses of knowledge base whose head contains literal
+    occurrences = None
+    # pairs of every chain in order of derivation
+    derivations = None
+    # pair of units P and !P if knowledge base is contradiction
+    contradiction = None
+
+    def __init__(self, knowledge_base=(), cnf="classic"):
+        # knowledge_base: formulas as text or parsed formulas
+        self.units = {}
+        self.chains = {}
+        self.heads = {}
+        self.occurrences = {}
+        self.derivations = []
+        super().__init__([self._parse(x) for x in knowledge_base], cnf)
+
+    @staticmethod
+    def _parse(formula):
+        if isinstance(formula, str):
+            return FormulaParser(formula)
+        return formula
+
+    def tell(self, formula):
+        # add formula to knowledge base, resolvents of earlier formulas are kept
+        self._add([self._parse(formula)])
+
+    def retract(self, formula):
+        # remove formula which was told before, only resolvents which depend on it are removed
+        formula = self._parse(formula).formula
+        for i, kb in enumerate(self.knowledge_base):
+            # formulas are hash-consed, same formula is same object
+            if kb.formula is formula:
+                break
+        else:
+            raise Exception(f"Knowledge Error: {formula} is not in knowledge base")
+
+        self.knowledge_base = self.knowledge_base[:i] + self.knowledge_base[i + 1:]
+        self.CNF_KB = self.CNF_KB[:i] + self.CNF_KB[i + 1:]
+        formula_clauses = self.formula_clauses[:i] + self.formula_clauses[i + 1:]
+
+        # clause is removed only if no other formula has it
+        used = set(index for indexes in formula_clauses for index in indexes)
+        new_indexes = {}
+        clauses = []
+        segregated_clauses = []
+        for index, clause in enumerate(self.clauses):
+            if index in used:
+                new_indexes[index] = len(clauses)
+                clauses.append(clause)
+                segregated_clauses.append(self.segregated_knowledge_base_clauses[index])
+
+        self.clauses = clauses
+        self.segregated_knowledge_base_clauses = segregated_clauses
+        self.formula_clauses = [[new_indexes[index] for index in indexes] for indexes in formula_clauses]
+        self.clause_indexes = {clause: index for index, clause in enumerate(clauses)}
+        self._invalidate()
+
+    def ask(self, query, mode=0, prover="resolution", progress=None, limits=None):
+        return super().ask(self._parse(query), mode, prover, progress, limits)
+
+    def retained_resolvents(self):
+        return self.derivations
+
+    def _add(self, knowledge_base):
+        new_clauses = super()._add(knowledge_base)
+
+        # new clauses are resolved with known units, new units are resolved with every clause
+        queue = []
+        for clause in new_clauses:
+            self.chains[clause] = []
+            self.heads[clause] = clause
+            for literal in clause.literals:
+                self.occurrences.setdefault(literal, set()).add(clause)
+                if -literal in self.units:
+                    queue.append(self.units[-literal])
+            if len(clause) == 1 and clause.literals[0] not in self.units:
+                self.units[clause.literals[0]] = clause
+                queue.append(clause)
+        self._propagate(queue)
+        return new_clauses
+
+    def _propagate(self, queue):
+        # unit resolution, every resolvent becomes new head of chain of its clause
+        while queue:
+            unit = queue.pop()
+            literal = unit.literals[0]
+            for clause in list(self.occurrences.get(-literal, [])):
+                pair = Pair(self.heads[clause], unit)
+                pair.resolve()
+                # P and !P, every query follows from knowledge base, first such pair is kept for proof
+                if pair.resolvent is None:
+                    if pair.is_contradict and self.contradiction is None:
+                        self.contradiction = pair
+                        self.derivations.append(pair)
+                    continue
+
+                head = pair.resolvent
+                self.derivations.append(pair)
+                self.chains[clause].append(pair)
+                self.heads[clause] = head
+                self.occurrences[-literal].discard(clause)
+
+                if len(head) == 1 and head.literals[0] not in self.units:
+                    self.units[head.literals[0]] = head
+                    queue.append(head)
+
+    def _invalidate(self):
+        # resolvent is valid if both clauses of its pair are valid, pairs are checked in order of derivation
+        valid = set(id(clause) for clause in self.clauses)
+        derivations = []
+        self.contradiction = None
+        for pair in self.derivations:
+            if id(pair.element1) in valid and id(pair.element2) in valid:
+                if pair.is_contradict:
+                    self.contradiction = pair
+                else:
+                    valid.add(id(pair.resolvent))
+                derivations.append(pair)
+        self.derivations = derivations
+
+        # chains are cut at first invalid pair
+        chains = {}
+        heads = {}
+        self.units = {}
+        self.occurrences = {}
+        for clause in self.clauses:
+            chain = []
+            for pair in self.chains[clause]:
+                if id(pair.resolvent) not in valid:
+                    break
+                chain.append(pair)
+            head = chain[-1].resolvent if chain else clause
+            chains[clause] = chain
+            heads[clause] = head
+
+            for literal in head.literals:
+                self.occurrences.setdefault(literal, set()).add(clause)
+            if len(head) == 1:
+                self.units.setdefault(head.literals[0], head)
+        self.chains = chains
+        self.heads = heads
+
+        # units which are still valid are resolved again with heads which lost their resolvents
+        self._propagate(list(self.units.values()))
@@ -0,0 +1,39 @@
+import time
+
+
+class Limits(object):
+    """
+    Budget of prover, None means no limit
+    Steps are resolved pairs (conflicts for SAT prover, chunks of 2^CHUNK_BITS assignments for truth table) and memory
+    is estimated from stored clauses and literals
+    """
+    # approximate bytes of stored clause (with its index entries) and of each of its literals
+    CLAUSE_BYTES = 1200
+    LITERAL_BYTES = 80
+
+    time = None
+    steps = None
+    clauses = None
+    memory = None
+
+    def __init__(self, time=None, steps=None, clauses=None, memory=None):
+        # time in seconds, memory in bytes
+        self.time = time
+        self.steps = steps
+        self.clauses = clauses
+        self.memory = memory
+
+    def __bool__(self):
+        return any(x is not None for x in [self.time, self.steps, self.clauses, self.memory])
+
+    def exceeded(self, started, steps, clauses, literals):
+        # returns name of exceeded limit or None, started is time.perf_counter() when proving started
+        if self.steps is not None and steps >= self.steps:
+            return "steps"
+        if self.clauses is not None and clauses >= self.clauses:
+            return "clauses"
+        if self.memory is not None and clauses * self.CLAUSE_BYTES + literals * self.LITERAL_BYTES >= self.memory:
+            return "memory"
+        if self.time is not None and time.perf_counter() - started >= self.time:
+            return "time"
+        return None
@@ -1,84 +1,150 @@
+import argparse
+import collections
+import itertools
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
-from pl_parser import Parser
+from cnf_cache import CNFCache
+from limits import Limits
+from portfolio import Portfolio
+from solver import divide_input, solve_problem
 
 DEFAULT_INPUT_FILE = "input.txt"
+# number of consecutive problems solved by one worker process
+CHUNK_SIZE = 8
 
 
-def divide_input(inputs):
-    ret = []
-    line_no = 0
-    n = len(inputs)
+def read_file(file_name):
+    with open(file_name) as f:
+        yield from divide_input(f)
 
-    ret.append([])
-    while line_no < n:
-        line = inputs[line_no]
-        # if line is empty then ignore
-        if not line:
-            line_no = line_no + 1
-            continue
 
-        # check number of line
-        ret[-1].append(line)
-        num_of_lines = int(line.split()[0])
-        for _ in range(num_of_lines):
-            line_no = line_no + 1
-            ret[-1].append(inputs[line_no])
-        # proposition
-        line_no = line_no + 1
-        ret[-1].append(inputs[line_no])
+def take_input(hard_input, file_name=None):
+    # "-" reads every problem from standard input
+    if file_name == "-":
+        return divide_input(sys.stdin)
 
-        # take next input if exists
-        line_no = line_no + 1
-        ret.append([])
+    if file_name:
+        return read_file(file_name)
 
-    if not ret[-1]:
-        ret = ret[:-1]
-    return ret
+    # check input from file if file exists
+    if not hard_input and os.path.isfile(DEFAULT_INPUT_FILE):
+        return read_file(DEFAULT_INPUT_FILE)
 
+    # otherwise take one problem from user
+    return itertools.islice(divide_input(sys.stdin), 1)
 
-def take_input(hard_input):
-    inputs = []
 
-    # check input from file if file exists
-    if not hard_input and os.path.isfile(DEFAULT_INPUT_FILE):
-        with open(DEFAULT_INPUT_FILE) as f:
-            temp_inputs = list(map(lambda x: x.strip(), f.readlines()))
-            inputs = divide_input(temp_inputs)
-    # otherwise take input from user
-    else:
-        # first check number of line
-        inputs.append([])
-        buffer_input = input()
-        inputs[0].append(buffer_input)
+def solve(problem, show_stats=False, limits=None, cache=None):
+    # returns result and stats of problem (None if show_stats is False)
+    # wrong problem eg. formula which can not be parsed gets its error as result, so next problems are still solved
+    try:
+        pl_problem = solve_problem(problem, limits, cache)
+    except Exception as e:
+        return str(e), None
+
+    # avoid flag: if True then mode parameter will be ignored and only result will print
+    # avoid flag: this flag is designed for HackerRank
+    # force flag: if true then mode parameter will be ignored and everything will print
+    # force flag: this flag is designed for development or curiosity !!
+    result = pl_problem.get_result(avoid=False, force=False)
+    return result, str(pl_problem.stats) if show_stats else None
+
+
+def solve_chunk(problems, show_stats=False, limits=None, cache=None):
+    return [solve(problem, show_stats, limits, cache) for problem in problems]
+
+
+def solve_in_parallel(inputs, jobs, show_stats=False, limits=None, cache=None):
+    # problems are independent, so solve them in worker processes and yield results in input order
+    # consecutive problems go to same worker, so it can reuse compiled knowledge base
+    # only few chunks are kept in flight, so input is never loaded as a whole
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        chunk = []
+        for obj in inputs:
+            chunk.append(obj)
+            if len(chunk) < CHUNK_SIZE:
+                continue
+            pending.append(executor.submit(solve_chunk, chunk, show_stats, limits, cache))
+            chunk = []
+            if len(pending) > jobs * 2:
+                yield from pending.popleft().result()
+
+        if chunk:
+            pending.append(executor.submit(solve_chunk, chunk, show_stats, limits, cache))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def print_result(result, stats):
+    print(result, flush=True)
+    # stats are printed to standard error, so results can still be compared
+    if stats:
+        print(stats, file=sys.stderr, flush=True)
+
+
+def solve_by_portfolio(inputs, portfolio, show_stats=False):
+    # every problem is raced by strategies of portfolio, winning strategy is printed to standard error
+    for problem in inputs:
         try:
-            num_of_rows = int(buffer_input.split()[0])
-            # take number of line as input
-            for _ in range(num_of_rows):
-                inputs[0].append(input())
-            # now time to add proposition inputs
-            inputs[0].append(input())
-        except ValueError as e:
-            print("Provide number of line as integer", e)
-    return inputs
-
-
-def run(hard_input=False):
-    inputs = take_input(hard_input)
-    # for each input create PL Logic problem and solve it
-    for obj in inputs:
-        pl_problem = Parser(obj).get_parsed_pl_problem()
-        # avoid flag: if True then mode parameter will be ignored and only result will print
-        # avoid flag: this flag is designed for HackerRank
-        # force flag: if true then mode parameter will be ignored and everything will print
-        # force flag: this flag is designed for development or curiosity !!
-        pl_problem.print_result(avoid=False, force=False)
+            winner, result, stats = portfolio.solve(problem)
+        except Exception as e:
+            # error of every strategy is printed like error of sequential run
+            winner, result, stats = None, str(e), None
+        print_result(result, str(stats) if show_stats and stats else None)
+        print(f"Portfolio winner: {winner or 'none'}", file=sys.stderr, flush=True)
+
+
+def run(hard_input=False, jobs=1, file_name=None, show_stats=False, limits=None, cache=None, strategies=None):
+    inputs = take_input(hard_input, file_name)
+
+    # strategies use their own processes, so problems are solved one by one
+    if strategies is not None:
+        solve_by_portfolio(inputs, Portfolio(strategies, limits, cache), show_stats)
+        return
+
+    # for each input create PL Logic problem, solve it and print result before reading next one
+    if jobs <= 1:
+        for obj in inputs:
+            print_result(*solve(obj, show_stats, limits, cache))
+        return
+
+    for result, stats in solve_in_parallel(inputs, jobs, show_stats, limits, cache):
+        print_result(result, stats)
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Propositional logic theorem prover")
+    arg_parser.add_argument("file", nargs="?", help=f"file with theorems, '-' reads standard input "
+                                                    f"(default: {DEFAULT_INPUT_FILE})")
     # check command wih -i flag (to take manual input)
-    if len(sys.argv) > 1 and sys.argv[1] == "-i":
-        run(hard_input=True)
-    else:
-        run()
+    arg_parser.add_argument("-i", dest="hard_input", action="store_true", help="take one theorem as manual input")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=1, help="number of processes which solve theorems")
+    arg_parser.add_argument("--stats", dest="show_stats", action="store_true",
+                            help="print time of every phase and counters of prover to standard error")
+    # result of theorem is unknown if prover reaches one of limits
+    arg_parser.add_argument("--time-limit", type=float, help="seconds which prover can spend on one theorem")
+    arg_parser.add_argument("--step-limit", type=int, help="resolved pairs (conflicts of sat prover) of one theorem")
+    arg_parser.add_argument("--clause-limit", type=int, help="clauses which prover can store for one theorem")
+    arg_parser.add_argument("--memory-limit", type=float,
+                            help="approximate megabytes of clauses stored for one theorem")
+    # compiled knowledge bases are kept on disk between runs
+    arg_parser.add_argument("--cache", metavar="DIR", help="folder of compiled knowledge bases")
+    arg_parser.add_argument("--cache-size", type=float, default=CNFCache.DEFAULT_MAX_SIZE / 1024 / 1024,
+                            help="megabytes of cache folder, least recently used files are removed "
+                                 "(default: %(default)s)")
+    # strategies are raced in separate processes, result of the first one which proves or disproves query is printed
+    arg_parser.add_argument("--portfolio", nargs="?", const=",".join(Portfolio.DEFAULT_STRATEGIES),
+                            metavar="STRATEGIES",
+                            help="race comma separated strategies of options on every theorem (default: %(const)s)")
+    args = arg_parser.parse_args()
+    if args.portfolio is not None and args.jobs > 1:
+        arg_parser.error("--portfolio can not be used with -j")
+    strategies = Portfolio.parse_strategies(args.portfolio) if args.portfolio is not None else None
+    memory_limit = int(args.memory_limit * 1024 * 1024) if args.memory_limit is not None else None
+    limits = Limits(args.time_limit, args.step_limit, args.clause_limit, memory_limit)
+    cache = CNFCache(args.cache, int(args.cache_size * 1024 * 1024)) if args.cache else None
+    run(hard_input=args.hard_input, jobs=args.jobs, file_name=args.file, show_stats=args.show_stats, limits=limits,
+        cache=cache, strategies=strategies)
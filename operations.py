@@ -1,126 +1,232 @@
-class Operand(object):
-    value = None
+import abc
+import heapq
+import weakref
+import zlib
+
+# (class, operator and ids of operands) -> weak reference of live node with that structure
+# operands are alive as long as node which has them, so their ids can not be reused while entry exists
+_nodes = {}
+
+
+class _NodeRef(weakref.ref):
+    """
+    Weak reference which knows its key in _nodes, unlike weakref.KeyedRef it is created without Python code
+    """
+    __slots__ = ("key",)
+
+
+def _remove(ref, nodes=_nodes):
+    # called when node is not used anymore, newer node with the same key is kept
+    if nodes.get(ref.key) is ref:
+        del nodes[ref.key]
+
+
+def _key_of(formula):
+    return formula._key
+
+
+class Formula(object, metaclass=abc.ABCMeta):
+    """
+    Base class of immutable formula nodes
+    Nodes are hash-consed: structurally identical formulas are the same object, so equality is identity
+    Node is found by class, operator and ids of its operands, hash and size are computed when node is created
+    and text of ordering key only when node is sorted as operand of NaryOperation
+    """
+    __slots__ = ("_hash", "_size", "_text", "__weakref__")
+
+    # length of formula text stored in ordering key
+    KEY_LENGTH = 32
+
+    @staticmethod
+    def _store(key, node, digest, size):
+        object.__setattr__(node, "_hash", digest)
+        object.__setattr__(node, "_size", size)
+        ref = _NodeRef(node, _remove)
+        ref.key = key
+        _nodes[key] = ref
+        return node
+
+    @property
+    def _key(self):
+        # formulas are ordered by text prefix and then by hash
+        try:
+            return self._text, self._hash
+        except AttributeError:
+            pass
+
+        # text of operands is computed first, formulas can be deep, so stack is used instead of recursion
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            pending = [x for x in node._key_operands() if not hasattr(x, "_text")]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            object.__setattr__(node, "_text", node._key_text()[:Formula.KEY_LENGTH])
+        return self._text, self._hash
+
+    def _key_operands(self):
+        # operands whose text is part of text of formula
+        return []
+
+    @abc.abstractmethod
+    def _key_text(self):
+        # text of formula made of text of operands, it is cut to KEY_LENGTH
+        pass
 
-    def __init__(self, value):
-        self.value = value
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
-    def __str__(self):
-        return f"{self.value}"
+    def __eq__(self, other):
+        return self is other
 
-    def __repr__(self):
-        return str(self)
+    def __ne__(self, other):
+        return self is not other
 
-    def __eq__(self, other):
-        if type(other) is not Operand:
-            return False
-        return self.value == other.value
+    def __hash__(self):
+        return self._hash
 
     def __len__(self):
-        return 1
+        # number of symbols in formula
+        return self._size
 
-    def eliminate_iff(self):
-        pass
+    def __str__(self):
+        # formula is printed with explicit stack, so depth of formula is not limited
+        ret = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if type(item) is str:
+                ret.append(item)
+            else:
+                stack.extend(reversed(item._parts()))
+        return "".join(ret)
 
-    def eliminate_implication(self):
+    @abc.abstractmethod
+    def _parts(self):
+        # text and operands which are printed in place of formula
         pass
 
-    def parse_not(self):
-        # Return itself
+    def optimize(self):
+        # only disjunction can be optimized
         return self
 
-    def propagate_not(self):
-        # Return negation of itself, no need to parse further because it will create loop
-        return UnaryOperation("!", self)
+    def segregate(self, symbol):
+        # only conjunction and disjunction can be segregated
+        return [self]
 
-    def parse_or_and(self):
-        # Return itself
-        return self
 
+class Operand(Formula):
+    __slots__ = ("value",)
 
-class UnaryOperation(object):
-    operator = None
-    operand = None
+    def __new__(cls, value):
+        key = (cls, value)
+        ref = _nodes.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
 
-    def __init__(self, operator, operand):
-        self.operator = operator
-        self.operand = operand
+        node = object.__new__(cls)
+        object.__setattr__(node, "value", value)
+        return cls._store(key, node, zlib.crc32(str(value).encode()), 1)
 
-    def __str__(self):
-        o = str(self.operand)
-
-        if len(o) > 1:
-            return f"{self.operator}({o})"
-        return f"{self.operator}{o}"
+    def __reduce__(self):
+        return Operand, (self.value,)
 
     def __repr__(self):
-        if type(self.operand) is Operand:
-            return f"{self.operator}{repr(self.operand)}"
-        return f'[Unary: {self.operator}, {repr(self.operand)}]'
+        return str(self)
 
-    def __eq__(self, other):
-        if type(other) is not UnaryOperation:
-            return False
-        return self.operator == other.operator and self.operand == other.operand
+    def _key_text(self):
+        return str(self.value)
 
-    def __len__(self):
-        if self.operand in [BinaryOperation, UnaryOperation]:
-            return 1 + len(self.operand)
-        return 1
+    def _parts(self):
+        return [f"{self.value}"]
 
-    def eliminate_iff(self):
-        # pass to operand
-        self.operand.eliminate_iff()
 
-    def eliminate_implication(self):
-        # pass to operand
-        self.operand.eliminate_implication()
+class UnaryOperation(Formula):
+    __slots__ = ("operator", "operand")
 
-    def parse_not(self):
-        # if operator is NOT then propagate to operand
-        if self.operator == "!":
-            return self.operand.propagate_not()
+    def __new__(cls, operator, operand):
+        key = (cls, operator, id(operand))
+        ref = _nodes.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
 
-        # otherwise parse operand and return self
-        self.operand = self.operand.parse_not()
-        return self
+        node = object.__new__(cls)
+        object.__setattr__(node, "operator", operator)
+        object.__setattr__(node, "operand", operand)
+        digest = (operand._hash * 1000003 + ord(operator)) & 0xFFFFFFFFFFFF
+        return cls._store(key, node, digest, operand._size)
 
-    def propagate_not(self):
-        # case !(!A) = A, return operand with further parsing
-        if self.operator == "!":
-            return self.operand.parse_not()
+    def __reduce__(self):
+        return UnaryOperation, (self.operator, self.operand)
 
-        # do nothing
-        return self
+    def _key_operands(self):
+        return [self.operand]
 
-    def parse_or_and(self):
-        # case !A return !A
+    def _key_text(self):
+        return f"{self.operator}{self.operand._text}"
+
+    def _parts(self):
+        if type(self.operand) is not Operand:
+            return [f"{self.operator}(", self.operand, ")"]
+        return [self.operator, self.operand]
+
+    def __repr__(self):
         if type(self.operand) is Operand:
-            return self
+            return f"{self.operator}{repr(self.operand)}"
+        return f'[Unary: {self.operator}, {repr(self.operand)}]'
 
-        # parse NOT first on operand and then check OR AND
-        self.operand = self.operand.parse_not().parse_or_and()
-        return self
 
+class BinaryOperation(Formula):
+    """
+    Implication and bidirectional implication, AND and OR are stored as NaryOperation
+    """
+    __slots__ = ("operator", "left_operand", "right_operand")
 
-class BinaryOperation(object):
-    operator = None
-    left_operand = None
-    right_operand = None
+    def __new__(cls, operator, left_operand, right_operand):
+        if operator in NARY_OPERATIONS:
+            raise Exception(f"Operation Error: use {NARY_OPERATIONS[operator].__name__} for {operator}")
 
-    def __init__(self, operator, left_operand, right_operand):
-        self.operator = operator
-        self.left_operand = left_operand
-        self.right_operand = right_operand
+        key = (cls, operator, id(left_operand), id(right_operand))
+        ref = _nodes.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
 
-    def __str__(self):
-        lo = str(self.left_operand)
-        ro = str(self.right_operand)
+        node = object.__new__(cls)
+        object.__setattr__(node, "operator", operator)
+        object.__setattr__(node, "left_operand", left_operand)
+        object.__setattr__(node, "right_operand", right_operand)
+        digest = (left_operand._hash * 1000003 ^ right_operand._hash * 8191 ^ ord(operator)) & 0xFFFFFFFFFFFF
+        return cls._store(key, node, digest, left_operand._size + right_operand._size)
+
+    def __reduce__(self):
+        return BinaryOperation, (self.operator, self.left_operand, self.right_operand)
+
+    def _key_operands(self):
+        return [self.left_operand, self.right_operand]
+
+    def _key_text(self):
+        lo = self.left_operand._text
+        if len(lo) < self.KEY_LENGTH:
+            return f"({lo}){self.operator}({self.right_operand._text})"
+        return lo
+
+    def _parts(self):
+        lo = self.left_operand
+        ro = self.right_operand
         o = self.operator
 
-        ret = ""
-        ret += f'({lo})' if len(lo) > 2 else f'{lo}'
-        ret += f'{o}'
-        ret += f'({ro})' if len(ro) > 2 else f'{ro}'
+        ret = []
+        ret += ["(", lo, ")"] if is_compound(lo) else [lo]
+        ret += [o]
+        ret += ["(", ro, ")"] if is_compound(ro) else [ro]
         return ret
 
     def __repr__(self):
@@ -129,244 +235,164 @@ class BinaryOperation(object):
         o = self.operator
         return f'[Binary: {o}, {repr(lo)}, {repr(ro)}]'
 
-    def __eq__(self, other):
-        if type(other) is not BinaryOperation:
-            return False
-
-        if self.operator == other.operator:
-            if self.operator in ["&", "|"]:
-                _l = self.left_operand
-                _r = self.right_operand
-                _ol = other.left_operand
-                _or = other.right_operand
-                return (_l == _ol and _r == _or) or (_l == _or and _r == _ol)
-
-            elif self.left_operand == other.left_operand and self.right_operand == other.right_operand:
-                return True
-        return False
 
-    def __len__(self):
-        return len(self.left_operand) + len(self.right_operand)
-
-    def eliminate_iff(self):
-        # Eliminate iff from right left operand first
-        self.left_operand.eliminate_iff()
-        self.right_operand.eliminate_iff()
-
-        # replace A=B to (A>B)&(B>A)
-        if self.operator == "=":
-            self.operator = "&"
-            lo = self.left_operand
-            ro = self.right_operand
-            self.left_operand = BinaryOperation(">", lo, ro)
-            self.right_operand = BinaryOperation(">", ro, lo)
-
-    def eliminate_implication(self):
-        # Eliminate implication from left right operand first
-        self.left_operand.eliminate_implication()
-        self.right_operand.eliminate_implication()
-
-        # replace A>B to !A|B
-        if self.operator == ">":
-            self.operator = "|"
-            self.left_operand = UnaryOperation("!", self.left_operand)
-
-    def parse_not(self):
-        # parse not in left and right operand
-        self.left_operand = self.left_operand.parse_not()
-        self.right_operand = self.right_operand.parse_not()
-        # return it self
-        return self
-
-    def propagate_not(self):
-        # This function is only implemented for AND OR operator
-        propagate_to_left_right = self.operator in ["|", "&"]  # check OR AND operator
+class NaryOperation(Formula):
+    """
+    Conjunction or disjunction of any number of operands
+    Nested operations of same type are flattened and operands are kept unique and in canonical order
+    """
+    __slots__ = ("operands",)
 
-        operator, lo, ro = None, None, None
-
-        # case !(A&B) --- !A|!B
-        if self.operator == "&":
-            operator = "|"
-        # case !(A|B) --- !A&!B
-        if self.operator == "|":
-            operator = "&"
+    operator = None
 
-        if propagate_to_left_right:
-            # propagate NOT to left right operand
-            lo = self.left_operand.propagate_not().parse_not()
-            ro = self.right_operand.propagate_not().parse_not()
-            return BinaryOperation(operator, lo, ro)
+    def __new__(cls, operands):
+        # two operands which are not nested are most common, they are only compared
+        if len(operands) == 2 and type(operands[0]) is not cls and type(operands[1]) is not cls:
+            first, second = operands
+            if first is second:
+                return first
+            first_key = first._key
+            second_key = second._key
+            if first_key == second_key:
+                # very unlikely, same text prefix and same digest
+                first_key, second_key = str(first), str(second)
+            operands = (first, second) if first_key < second_key else (second, first)
+            return cls._create(operands)
+
+        # flatten A&(B&C) to A&B&C, operands of nested operation are already in canonical order,
+        # so only other operands are sorted and then merged with them
+        nested = []
+        other = []
+        for operand in operands:
+            if type(operand) is cls:
+                nested.append(operand.operands)
+            else:
+                other.append(operand)
+        other.sort(key=_key_of)
+        if not nested:
+            merged = other
+        elif len(nested) == 1 and not other:
+            merged = nested[0]
         else:
-            # do nothing
-            return self
-
-    def parse_or_and(self):
-        # parse OR AND in left operand
-        self.left_operand = self.left_operand.parse_or_and()
-        # parse OR AND in right operand
-        self.right_operand = self.right_operand.parse_or_and()
-
-        # if operator is OR then only we need to check
-        if self.operator == "|":
-            left_end = type(self.left_operand) == BinaryOperation and self.left_operand.operator == "&"
-            right_end = type(self.right_operand) == BinaryOperation and self.right_operand.operator == "&"
-
-            # case (A&B)|(C&D) --- (A|C)&(A|D)&(B|C)&(B|D)
-            if left_end & right_end:
-                # first left
-                fl = self.left_operand.left_operand
-                # first right
-                fr = self.left_operand.right_operand
-                # second left
-                sl = self.right_operand.left_operand
-                # second right
-                sr = self.right_operand.right_operand
-
-                # prepare left operand
-                new_fl = BinaryOperation("|", fl, sl).parse_or_and()
-                new_fr = BinaryOperation("|", fl, sr).parse_or_and()
-                new_left = BinaryOperation("&", new_fl, new_fr)
-
-                # prepare right operand
-                new_sl = BinaryOperation("|", fr, sl).parse_or_and()
-                new_sr = BinaryOperation("|", fr, sr).parse_or_and()
-                new_right = BinaryOperation("&", new_sl, new_sr)
-
-                return BinaryOperation("&", new_left, new_right).parse_or_and()
-
-            # case (A&B)|C --- (A|C)&(B|C)
-            elif left_end:
-                # first left
-                fl = self.left_operand.left_operand
-                # first right
-                fr = self.left_operand.right_operand
-                # second operand
-                s = self.right_operand
-
-                new_left = BinaryOperation("|", fl, s).parse_or_and()
-                new_right = BinaryOperation("|", fr, s).parse_or_and()
-                return BinaryOperation("&", new_left, new_right).parse_or_and()
-
-            # case A&(B|C) --- (A|B)&(A|C)
-            elif right_end:
-                # first
-                f = self.left_operand
-                # second left
-                sl = self.right_operand.left_operand
-                # second right
-                sr = self.right_operand.right_operand
-
-                new_left = BinaryOperation("|", f, sl).parse_or_and()
-                new_right = BinaryOperation("|", f, sr).parse_or_and()
-                return BinaryOperation("&", new_left, new_right).parse_or_and()
-
-        # if operator is not OR then return itself
-        return self
-
-    def optimize_v1(self):
-        # method is deprecated as it's improved version exists
-
-        # This method is only written for OR Operation
-        if not self.operator == "|":
-            return self
-
-        if type(self.left_operand) is BinaryOperation:
-            self.left_operand = self.left_operand.optimize()
-
-        if type(self.right_operand) is BinaryOperation:
-            self.right_operand = self.right_operand.optimize()
-
-        if not self.left_operand and not self.right_operand:
-            return None
-
-        if not self.left_operand:
-            return self.right_operand
+            merged = heapq.merge(other, *nested, key=_key_of)
+
+        # A&A = A, same operands are next to each other in order
+        unique = []
+        previous = previous_key = None
+        is_tie = False
+        for operand in merged:
+            if operand is previous:
+                continue
+            key = operand._key
+            if key == previous_key:
+                # very unlikely, same text prefix and same digest
+                is_tie = True
+            unique.append(operand)
+            previous, previous_key = operand, key
+        if is_tie:
+            unique = sorted({id(x): x for x in unique}.values(), key=lambda x: (x._key, str(x)))
+
+        if not unique:
+            raise Exception(f"Operation Error: {cls.__name__} needs at least one operand")
+        if len(unique) == 1:
+            return unique[0]
+        return cls._create(tuple(unique))
+
+    @classmethod
+    def _create(cls, operands):
+        # node of unique operands in canonical order
+        key = (cls, tuple(map(id, operands)))
+        ref = _nodes.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
+
+        node = object.__new__(cls)
+        object.__setattr__(node, "operands", operands)
+        digest = ord(cls.operator)
+        size = 0
+        for operand in operands:
+            digest = (digest * 1000003 ^ operand._hash) & 0xFFFFFFFFFFFF
+            size += operand._size
+        return cls._store(key, node, digest, size)
+
+    def __reduce__(self):
+        return type(self), (self.operands,)
+
+    def _key_operands(self):
+        return self.operands[:self.KEY_LENGTH]
+
+    def _key_text(self):
+        return self.operator.join(f"({x._text})" for x in self._key_operands())
+
+    def _parts(self):
+        ret = []
+        for operand in self.operands:
+            if ret:
+                ret.append(self.operator)
+            ret += ["(", operand, ")"] if is_compound(operand) else [operand]
+        return ret
 
-        if not self.right_operand:
-            return self.left_operand
+    def __repr__(self):
+        return f'[{type(self).__name__}: {", ".join(repr(x) for x in self.operands)}]'
 
-        # A OR A = A
-        if self.left_operand == self.right_operand:
-            return self.left_operand
+    def segregate(self, symbol):
+        if self.operator == symbol:
+            return list(self.operands)
+        return [self]
 
-        # (A OR B) OR A = A OR B
-        if type(self.left_operand) is BinaryOperation and type(self.right_operand) is not BinaryOperation:
-            ll = self.left_operand.left_operand
-            lr = self.left_operand.right_operand
-            r = self.right_operand
 
-            if ll == r or lr == r:
-                return self.left_operand
+class And(NaryOperation):
+    __slots__ = ()
 
-        # A OR (A OR B) = (A OR B)
-        if type(self.right_operand) is BinaryOperation and type(self.left_operand) is not BinaryOperation:
-            _l = self.left_operand
-            rl = self.right_operand.left_operand
-            rr = self.right_operand.right_operand
+    operator = "&"
 
-            if _l == rl or _l == rr:
-                return self.right_operand
 
-        # A OR !A = True -> ignore this
-        if self.left_operand == UnaryOperation("!", self.right_operand).parse_not():
-            return None
+class Or(NaryOperation):
+    __slots__ = ()
 
-        return self
+    operator = "|"
 
     def optimize(self):
-        # this function is defined only for OR function
-        if self.operator != "|":
-            return self
+        # A OR !A = True, whole clause is tautology
+        literals = set(self.operands)
+        for literal in self.operands:
+            if negate(literal) in literals:
+                return None
+        return self
 
-        # segregate everything by OR
-        literals = self.segregate("|")
 
-        # store all unique literals
-        literal_set = list()
+# operator -> class of operation with any number of operands
+NARY_OPERATIONS = {
+    "&": And,
+    "|": Or,
+}
 
-        # loop over all literals
-        for literal in literals:
-            # if negation of literal exists then no need to include it in set
-            if UnaryOperation("!", literal).parse_not() not in literals:
 
-                # if literal is being repeated then no need to repeat
-                if literal not in literal_set:
-                    literal_set.append(literal)
+def create_operation(operator, left_operand, right_operand):
+    # operation with two operands, AND and OR are flattened to NaryOperation
+    if operator in NARY_OPERATIONS:
+        return NARY_OPERATIONS[operator]([left_operand, right_operand])
+    return BinaryOperation(operator, left_operand, right_operand)
 
-        def create_clause_with_given_symbol(arr, symbol):
-            if len(arr) == 0:
-                return None
 
-            if len(arr) == 1:
-                return arr[0]
+def create_clause_with_given_symbol(arr, symbol):
+    if len(arr) == 0:
+        return None
 
-            if len(arr) == 2:
-                return BinaryOperation(symbol, arr[0], arr[1])
+    return NARY_OPERATIONS[symbol](arr)
 
-            if len(arr) % 2 == 0:
-                m = len(arr) // 2
-            else:
-                m = (len(arr) // 2) + 1
 
-            return BinaryOperation(symbol, create_clause_with_given_symbol(arr[:m], symbol),
-                                   create_clause_with_given_symbol(arr[m:], symbol))
+def negate(literal):
+    # !(!A) = A
+    if type(literal) is UnaryOperation and literal.operator == "!":
+        return literal.operand
+    return UnaryOperation("!", literal)
 
-        return create_clause_with_given_symbol(literal_set, "|")
 
-    def segregate(self, symbol):
-        if self.operator == symbol:
-            ret = []
-            if type(self.left_operand) is BinaryOperation:
-                ret += self.left_operand.segregate(symbol)
-            else:
-                ret += [self.left_operand]
-
-            if type(self.right_operand) is BinaryOperation:
-                ret += self.right_operand.segregate(symbol)
-            else:
-                ret += [self.right_operand]
-
-            return ret
-
-        else:
-            return [self]
+def is_compound(formula):
+    # symbol and negated symbol are printed without parenthesis
+    if type(formula) is Operand:
+        return False
+    return not (type(formula) is UnaryOperation and type(formula.operand) is Operand)
@@ -1,4 +1,17 @@
-from operations import BinaryOperation, UnaryOperation
+import heapq
+import time
+
+from operations import UnaryOperation, create_clause_with_given_symbol
+from clauses import SymbolTable, Clause, ClauseIndex, renumber
+from cnf import CNFConverter
+from tseitin import TseitinConverter
+from sat_solver import SATSolver
+from horn import HornSolver
+from two_sat import TwoSATSolver
+from truth_table import TruthTable
+from relevance import RelevanceGraph
+from stats import Stats
+from limits import Limits
 
 
 class Knowledge(object):
@@ -16,35 +29,25 @@ class Knowledge(object):
     def __str__(self):
         return str(self.formula)
 
-    def convert_to_cnf(self):
-        self._eliminate_iff_and_implication()
-        self._parse_not()
-        self._parse_or_and()
-
-    def _eliminate_iff_and_implication(self):
-        self.formula.eliminate_iff()
-        self.formula.eliminate_implication()
-
-        # to be safe side
-        self.formula.eliminate_iff()
-        self.formula.eliminate_implication()
-
-    def _parse_not(self):
-        self.formula = self.formula.parse_not()
-        # to be safe side
-        self.formula = self.formula.parse_not()
-
-    def _parse_or_and(self):
-        self.formula = self.formula.parse_or_and()
-        # to be safe side
-        self.formula = self.formula.parse_or_and()
+    def convert_to_cnf(self, converter=None):
+        # classic conversion is used if definitional (tseitin) converter is not given
+        if not converter:
+            converter = CNFConverter()
+        self.formula = converter.convert(self.formula)
 
     def segregate(self, symbol):
-        if type(self.formula) is BinaryOperation:
+        if self.formula:
             return self.formula.segregate(symbol)
         return [self.formula]
 
 
+def optimize_clause(clause):
+    # optimize segregated formula, None is returned for tautology
+    if clause:
+        return clause.optimize()
+    return clause
+
+
 class Pair(object):
     element1 = None
     element2 = None
@@ -71,23 +74,224 @@ class Pair(object):
     def __repr__(self):
         return str(self)
 
+    def __hash__(self):
+        # pair is unordered so hash must not depend on order of elements
+        return hash(self.element1) ^ hash(self.element2)
+
     def __len__(self):
         return len(self.element1) + len(self.element2)
 
     def resolve(self):
-        self.resolvent = BinaryOperation("|", self.element1, self.element2).optimize()
-        if not self.resolvent:
-            # P|Q and !P|!Q this resolves none but they do not contradict each other
-            self.is_contradict = len(self.element1) == 1 and len(self.element2) == 1
-        else:
+        literals1 = self.element1.literals
+        literal_set1 = self.element1.literal_set
+        literal_set2 = self.element2.literal_set
+        complements = [x for x in literals1 if -x in literal_set2]
+
+        # P|Q and !P|!Q this resolves to tautology but they do not contradict each other
+        if len(complements) != 1:
+            self.resolvent = None
+            self.is_contradict = False
+            return
+
+        literal = complements[0]
+        literals = [x for x in literals1 if x != literal]
+        for x in self.element2.literals:
+            if x != -literal and x not in literal_set1:
+                literals.append(x)
+
+        if literals:
+            # clause of query can have symbols which symbol table of knowledge base does not have
+            symbols = self.element1.symbols
+            if symbols is not self.element2.symbols and len(self.element2.symbols) > len(symbols):
+                symbols = self.element2.symbols
+            self.resolvent = Clause(literals, symbols)
             self.is_contradict = False
+        else:
+            # P and !P resolves nothing, it is contradiction
+            self.resolvent = None
+            self.is_contradict = True
+
+
+class KnowledgeBase(object):
+    """
+    Knowledge base which is converted to CNF and compiled only once, many queries can be asked against it
+    """
+    cnf = None
+    converter = None
+
+    # inputs
+    knowledge_base = None
+
+    # CNF converted
+    CNF_KB = None
+
+    # segregated by AND and optimized
+    segregated_knowledge_base_clauses = None
+
+    # compiled clauses, aligned with segregated clauses
+    symbols = None
+    clauses = None
+    # indexes of clauses (in clauses) which each CNF formula is made of
+    formula_clauses = None
+    # compiled clause -> its index in clauses
+    clause_indexes = None
+    # function which returns parsed formulas of knowledge base restored from compiled clauses
+    parse_knowledge_base = None
+    # forward chaining of Horn knowledge base and clauses it is made for
+    horn = None
+    horn_clauses = None
+    # components of symbols which are connected by clauses and clauses they are made for
+    relevance = None
+    relevance_clauses = None
+
+    # time of building knowledge base
+    stats = None
+
+    def __init__(self, knowledge_base, cnf="classic"):
+        self.cnf = cnf
+        self.knowledge_base = []
+        self.CNF_KB = []
+        self.segregated_knowledge_base_clauses = []
+        self.symbols = SymbolTable()
+        self.clauses = []
+        self.formula_clauses = []
+        self.clause_indexes = {}
+        self.stats = Stats()
+
+        # classic conversion distributes OR over AND, tseitin conversion names sub formulas
+        self.converter = TseitinConverter() if cnf == "tseitin" else None
+
+        # prepare knowledge base
+        self._add(knowledge_base)
+
+    def _add(self, knowledge_base):
+        # convert formulas to CNF and compile their clauses, returns compiled clauses which were not known before
+        # lists are copied, so problems which are already created keep knowledge base they were asked against
+        # restored knowledge base needs its formulas, so new clauses are aligned with segregated clauses
+        self.restore_formulas()
+        knowledge = []
+        cnf_kb = []
+        with self.stats.phase("cnf"):
+            for kb in knowledge_base:
+                knowledge.append(Knowledge(kb))
+                temp_kb = Knowledge(kb)
+                temp_kb.convert_to_cnf(self.converter)
+                cnf_kb.append(temp_kb)
+        self.knowledge_base = self.knowledge_base + knowledge
+        self.CNF_KB = self.CNF_KB + cnf_kb
+
+        # segregate knowledge base with symbol AND
+        with self.stats.phase("segregate"):
+            segregated = [kb.segregate("&") for kb in cnf_kb]
+
+        with self.stats.phase("optimize"):
+            optimized = [[t for t in map(optimize_clause, x) if t] for x in segregated]
+
+        # compile clauses, compiled clauses are used to find duplicates
+        with self.stats.phase("compile"):
+            segregated_clauses = list(self.segregated_knowledge_base_clauses)
+            clauses = list(self.clauses)
+            formula_clauses = list(self.formula_clauses)
+            known_clauses = self.clause_indexes
+            new_clauses = []
+            for formula in optimized:
+                indexes = []
+                for t in formula:
+                    clause = Clause.compile(t, self.symbols)
+                    if clause not in known_clauses:
+                        known_clauses[clause] = len(clauses)
+                        segregated_clauses.append(t)
+                        clauses.append(clause)
+                        new_clauses.append(clause)
+                    indexes.append(known_clauses[clause])
+                formula_clauses.append(indexes)
+            self.segregated_knowledge_base_clauses = segregated_clauses
+            self.clauses = clauses
+            self.formula_clauses = formula_clauses
+        self.stats.count("knowledge_base_clauses", len(new_clauses))
+        return new_clauses
+
+    def horn_solver(self):
+        # returns HornSolver saturated by knowledge base, None if knowledge base is not Horn
+        # lists of clauses are replaced when knowledge base changes, so solver is built again only then
+        if self.horn_clauses is not self.clauses:
+            self.horn_clauses = self.clauses
+            literals = [x.literals for x in self.clauses]
+            self.horn = HornSolver(literals) if HornSolver.is_horn(literals) else None
+        return self.horn
+
+    def relevance_graph(self):
+        # returns RelevanceGraph of clauses, it is built again only when knowledge base changes like HornSolver
+        if self.relevance_clauses is not self.clauses:
+            self.relevance_clauses = self.clauses
+            self.relevance = RelevanceGraph([x.literals for x in self.clauses])
+        return self.relevance
+
+    def retained_resolvents(self):
+        # pairs whose resolvents follow from knowledge base alone, in order of derivation
+        # they are kept between queries by IncrementalKnowledgeBase
+        return []
+
+    @classmethod
+    def restore(cls, knowledge_base, cnf, names, clauses, formula_clauses, count=0):
+        # knowledge base from already compiled clauses eg. loaded from cache, CNF is not computed again
+        # knowledge_base: function which returns parsed formulas, formulas are needed only to print them
+        # names: symbol names in order of their ids, clauses: literals of clauses, count: count of tseitin converter
+        self = cls.__new__(cls)
+        self.cnf = cnf
+        self.stats = Stats()
+        self.converter = TseitinConverter(count) if cnf == "tseitin" else None
+        self.parse_knowledge_base = knowledge_base
+
+        self.symbols = SymbolTable()
+        for name in names:
+            self.symbols.intern(name)
+        self.clauses = [Clause(literals, self.symbols) for literals in clauses]
+        self.formula_clauses = formula_clauses
+        self.clause_indexes = {clause: i for i, clause in enumerate(self.clauses)}
+        # formulas are empty till restore_formulas is called
+        self.knowledge_base = []
+        self.segregated_knowledge_base_clauses = []
+        self.stats.count("knowledge_base_clauses", len(self.clauses))
+        return self
+
+    def restore_formulas(self):
+        # formulas of restored knowledge base are rebuilt when they are printed for the first time
+        if self.CNF_KB is not None:
+            return
+
+        self.knowledge_base = [Knowledge(kb) for kb in self.parse_knowledge_base()]
+        self.segregated_knowledge_base_clauses = [clause.to_formula() for clause in self.clauses]
+
+        # CNF of every formula is rebuilt from its clauses
+        self.CNF_KB = []
+        for indexes in self.formula_clauses:
+            formula = create_clause_with_given_symbol([self.segregated_knowledge_base_clauses[i] for i in indexes], "&")
+            self.CNF_KB.append(Knowledge(formula, by_formula=True))
+
+    def query_converter(self):
+        # every query starts numbering of fresh symbols from same number, so result does not depend on query order
+        if self.converter:
+            return TseitinConverter(self.converter.count)
+        return None
+
+    def ask(self, query, mode=0, prover="resolution", progress=None, limits=None):
+        return PLLogicProblem(self, query, mode, prover=prover, progress=progress, limits=limits)
 
 
 class PLLogicProblem(object):
+    # progress callback is called after this many given clauses of resolution
+    PROGRESS_INTERVAL = 1000
+
     # inputs
     knowledge_base = None
     query = None
     mode = None
+    cnf = None
+    prover = None
+
+    # compiled knowledge base
+    compiled_knowledge_base = None
 
     # CNF converted
     CNF_KB = None
@@ -98,98 +302,148 @@ class PLLogicProblem(object):
     segregated_query_clauses = None
 
     # prover
+    symbols = None
     steps_to_prove = None
+    # True, False or None if result is unknown because one of limits is reached
     is_query_true = None
+    # assignment of symbols in which knowledge base is true and query is false, found by table prover
+    model = None
 
-    def __init__(self, knowledge_base, query, mode):
-        self.mode = mode
-        self.knowledge_base = []
-        self.CNF_KB = []
+    # budget of prover, name of reached limit and time.perf_counter() when problem is created
+    limits = None
+    limit_reached = None
+    started = None
 
-        # prepare knowledge base
-        for kb in knowledge_base:
-            self.knowledge_base.append(Knowledge(kb))
-            temp_kb = Knowledge(kb)
-            temp_kb.convert_to_cnf()
-            self.CNF_KB.append(temp_kb)
+    # time of every phase and counters of prover, progress is called with stats while proving
+    stats = None
+    progress = None
+
+    def __init__(self, knowledge_base, query, mode, cnf="classic", prover="resolution", stats=None, progress=None,
+                 limits=None):
+        # stats: optional Stats which already has time of earlier phases eg. parsing
+        # progress: optional function which is called with stats from time to time while proving
+        # limits: optional Limits, result is unknown if prover reaches one of them
+        self.started = time.perf_counter()
+        self.stats = stats if stats is not None else Stats()
+        self.progress = progress
+        self.limits = limits if limits is not None else Limits()
+
+        # knowledge base can be list of formulas or already compiled knowledge base
+        if not isinstance(knowledge_base, KnowledgeBase):
+            knowledge_base = KnowledgeBase(knowledge_base, cnf)
+            self.stats.merge(knowledge_base.stats)
+
+        self.mode = mode
+        self.cnf = knowledge_base.cnf
+        self.prover = prover
+        self.compiled_knowledge_base = knowledge_base
+        self.knowledge_base = knowledge_base.knowledge_base
+        self.CNF_KB = knowledge_base.CNF_KB
+        self.segregated_knowledge_base_clauses = knowledge_base.segregated_knowledge_base_clauses
 
         # prepare proposition
-        self.query = Knowledge(query)
-        negated_proposition = UnaryOperation("!", self.query.formula)
-        self.negated_cnf_query = Knowledge(negated_proposition, by_formula=True)
-        self.negated_cnf_query.convert_to_cnf()
-        # segregate query and knowledge base
-        self._prepare_segregation()
+        with self.stats.phase("cnf"):
+            self.query = Knowledge(query)
+            negated_proposition = UnaryOperation("!", self.query.formula)
+            self.negated_cnf_query = Knowledge(negated_proposition, by_formula=True)
+            self.negated_cnf_query.convert_to_cnf(knowledge_base.query_converter())
+        # segregate query
+        with self.stats.phase("segregate"):
+            self._prepare_segregation()
 
-        # optimize knowledge base and query
-        self._optimize_kb_and_query()
+        # optimize query
+        with self.stats.phase("optimize"):
+            self._optimize_query()
 
         # prove query :)
         self.prove()
 
     def _prepare_segregation(self):
-        # segregate knowledge base with symbol AND
-        self.segregated_knowledge_base_clauses = []
-        for kb in self.CNF_KB:
-            self.segregated_knowledge_base_clauses += kb.segregate("&")
-
+        # segregate query with symbol AND
         self.segregated_query_clauses = self.negated_cnf_query.segregate("&")
 
-    def _optimize_kb_and_query(self):
+    def _optimize_query(self):
         # optimize segregated formulas
-        def optimize(x):
-            if type(x) is BinaryOperation:
-                return x.optimize()
-            return x
-
-        temp = []
-        for kb in self.segregated_knowledge_base_clauses:
-            t = optimize(kb)
-            if t and t not in temp:
-                temp.append(t)
-        self.segregated_knowledge_base_clauses = temp
-
         temp = []
         for kb in self.segregated_query_clauses:
-            t = optimize(kb)
+            t = optimize_clause(kb)
             if t and t not in temp:
                 temp.append(t)
         self.segregated_query_clauses = temp
 
     def print_result(self, force=False, avoid=False):
+        print(self.get_result(force, avoid))
+
+    def verdict(self):
+        # "1" if query is true, "0" if it is false and "unknown" if one of limits is reached
+        if self.is_query_true is None:
+            return "unknown"
+        return "1" if self.is_query_true else "0"
+
+    def get_result(self, force=False, avoid=False):
+        # returns text which is printed by print_result
         if avoid:
-            print("1" if self.is_query_true else "0")
-        elif force:
-            print(self)
-        else:
-            if self.mode == 0:
-                print("1" if self.is_query_true else "0")
+            return self.verdict()
+        if force:
+            return str(self)
+        if self.mode == 0:
+            return self.verdict()
+
+        self._restore_formulas()
+
+        ret = []
+        i = 1
+        for t in self.segregated_knowledge_base_clauses:
+            ret.append(f"{i:2}. {t} (CNF form)")
+            i += 1
+        for t in self.segregated_query_clauses:
+            ret.append(f"{i:2}. {t} (Negation of query)")
+            i += 1
+        if self.prover != "resolution":
+            if self.limit_reached:
+                ret.append(f"{i:2}. Limit of {self.limit_reached} is reached [Using {self.prover} prover]")
+            elif self.prover == "table":
+                if self.model is None:
+                    result = "Query is true in every assignment in which knowledge base is true"
+                else:
+                    model = ", ".join(name if value else f"!{name}" for name, value in self.model.items())
+                    result = f"Knowledge base is true and query is false when {model}"
+                ret.append(f"{i:2}. {result} [Using {self.prover} prover]")
             else:
-                i = 1
-                for t in self.segregated_knowledge_base_clauses:
-                    print(f"{i:2}. {t} (CNF form)")
-                    i += 1
-                for t in self.segregated_query_clauses:
-                    print(f"{i:2}. {t} (Negation of query)")
-                    i += 1
-                for t in self.steps_to_prove:
-                    if t.resolvent:
-                        print(f"{i:2}. {t.resolvent} [Using pair {t}]")
-                    else:
-                        if t.is_contradict:
-                            print(f"{i:2}. Contradiction !! [Using pair {t}]")
-                        else:
-                            print(f"{i:2}. Resolved pair {t}")
-                    i += 1
-                if self.is_query_true:
-                    print("1")
+                result = "unsatisfiable" if self.is_query_true else "satisfiable"
+                ret.append(f"{i:2}. Clauses are {result} [Using {self.prover} prover]")
+            ret.append(self.verdict())
+            return "\n".join(ret)
+        for t in self.steps_to_prove:
+            if t.resolvent:
+                ret.append(f"{i:2}. {t.resolvent} [Using pair {t}]")
+            else:
+                if t.is_contradict:
+                    ret.append(f"{i:2}. Contradiction !! [Using pair {t}]")
                 else:
-                    print(f"{i:2}. No pair found that supports query clauses or resolved clauses")
-                    print("0")
+                    ret.append(f"{i:2}. Resolved pair {t}")
+            i += 1
+        if self.limit_reached:
+            ret.append(f"{i:2}. Limit of {self.limit_reached} is reached before query is proved or disproved")
+        elif not self.is_query_true:
+            ret.append(f"{i:2}. No pair found that supports query clauses or resolved clauses")
+        ret.append(self.verdict())
+        return "\n".join(ret)
+
+    def _restore_formulas(self):
+        # knowledge base loaded from cache has no formulas till they are printed
+        compiled_knowledge_base = self.compiled_knowledge_base
+        compiled_knowledge_base.restore_formulas()
+        self.knowledge_base = compiled_knowledge_base.knowledge_base
+        self.CNF_KB = compiled_knowledge_base.CNF_KB
+        self.segregated_knowledge_base_clauses = compiled_knowledge_base.segregated_knowledge_base_clauses
 
     def __str__(self):
+        self._restore_formulas()
         ret = "------------------------------\n"
         ret += f'Mode: {self.mode}\n'
+        ret += f'CNF conversion: {self.cnf}\n'
+        ret += f'Prover: {self.prover}\n'
 
         ret += "\nStatement to prove:\n"
         ret += f'{self.query}\n'
@@ -219,6 +473,11 @@ class PLLogicProblem(object):
 
         ret += "\nResult:\n"
         ret += f"Above Query is {self.is_query_true}\n"
+        if self.limit_reached:
+            ret += f"Limit of {self.limit_reached} is reached\n"
+
+        ret += "\nStats:\n"
+        ret += f"{self.stats}\n"
         ret += "------------------------------"
         return ret
 
@@ -301,57 +560,477 @@ class PLLogicProblem(object):
     #             query_clauses.append(pair.resolvent)
 
     def prove(self):
-        def is_resolvable(cl1, cl2):
-            literals1 = cl1.segregate("|") if type(cl1) is BinaryOperation else [cl1]
-            literals2 = cl2.segregate("|") if type(cl2) is BinaryOperation else [cl2]
-            for literal in literals2:
-                if UnaryOperation("!", literal).parse_not() in literals1:
-                    return True
-            return False
+        # compile clauses to integer literals, trees are rebuilt only to print them
+        with self.stats.phase("compile"):
+            # symbols of query are added to overlay, so symbol table of knowledge base does not grow with queries
+            self.symbols = self.compiled_knowledge_base.symbols.overlay()
+            kb_clauses = self.compiled_knowledge_base.clauses
+            query_clauses = [Clause.compile(x, self.symbols) for x in self.segregated_query_clauses]
+        self.stats.count("query_clauses", len(query_clauses))
+
+        # Horn knowledge base is saturated once for all its queries, so it is used as a whole
+        is_horn = self.prover == "resolution" and self._is_horn(query_clauses)
+        relevant = None
+        if not is_horn:
+            with self.stats.phase("slice"):
+                relevant = self._slice(query_clauses)
+            self.stats.set("irrelevant_clauses", len(kb_clauses) - len(relevant))
+            kb_clauses = [kb_clauses[i] for i in relevant]
+
+        with self.stats.phase("prove"):
+            formulas = self._relevant_formulas(relevant) if self.prover == "table" else None
+            if self.prover == "table" and not TruthTable.is_small(formulas + [self.query.formula]):
+                # table of too many symbols is too large, resolution decides it instead
+                self.prover = "resolution"
+                self.stats.count("table_fallbacks")
+                is_horn = self._is_horn(query_clauses)
+
+            if self.prover == "sat":
+                self._prove_by_sat(kb_clauses, query_clauses)
+            elif self.prover == "table":
+                self._prove_by_table(formulas)
+            elif is_horn:
+                # Horn clauses are decided by forward chaining, it is faster than any search of pairs
+                self._prove_by_horn(self.compiled_knowledge_base.clauses, query_clauses)
+            elif TwoSATSolver.is_2cnf(x.literals for x in kb_clauses + query_clauses):
+                # clauses with at most two literals are decided by components of implication graph
+                self._prove_by_2sat(kb_clauses, query_clauses)
+            else:
+                self._prove_by_resolution(kb_clauses, query_clauses)
+
+    def _slice(self, query_clauses):
+        # returns indexes of knowledge base clauses which are connected to negation of query by shared symbols
+        # other clauses can not take part in any resolution with query, so they are not given to prover
+        symbols = {abs(literal) for clause in query_clauses for literal in clause.literals}
+        return self.compiled_knowledge_base.relevance_graph().slice(symbols)
+
+    def _relevant_formulas(self, relevant):
+        # formulas of knowledge base which have at least one relevant clause
+        # knowledge base from cache has formulas only after they are restored
+        self._restore_formulas()
+        relevant = set(relevant)
+        return [x.formula for x, indexes in zip(self.knowledge_base, self.compiled_knowledge_base.formula_clauses)
+                if any(i in relevant for i in indexes)]
 
-        def find_resolvable_pair(cls, visited):
-            # check query clauses with all clauses see if any pair is resolvable
-            selected_pairs = []
-            for q in cls:
-                for a in cls:
-                    if not q == a and is_resolvable(q, a):
-                        select_pair = Pair(q, a)
-                        if not (select_pair in visited or select_pair in selected_pairs):
-                            selected_pairs.append(select_pair)
-            # sort by length of pair, we are preferring unit resolution
-            selected_pairs.sort(key=lambda x: len(x))
-            return selected_pairs[0] if selected_pairs else None
-
-        kb_clauses = list(self.segregated_knowledge_base_clauses)
-        query_clauses = list(self.segregated_query_clauses)
+    def _prove_by_table(self, formulas):
+        # query is true if it is true in every assignment of symbols in which knowledge base is true
+        def is_exhausted():
+            self.limit_reached = self.limits.exceeded(self.started, table.chunks, 0, 0)
+            return self.limit_reached is not None
+
+        table = TruthTable(formulas, self.query.formula)
+        if self.limits:
+            table.stop = is_exhausted
+
+        # table does not create resolution steps
         self.steps_to_prove = []
-        resolved_pairs = []
+        self.is_query_true = table.entails()
+        self.model = table.model
+        self.stats.set("table_symbols", len(table.symbols))
+        self.stats.set("table_chunks", table.chunks)
+
+    def _prove_by_sat(self, kb_clauses, query_clauses):
+        # query is true if knowledge base together with negation of query is unsatisfiable
+        def record():
+            self.stats.set("decisions", solver.decisions)
+            self.stats.set("conflicts", solver.conflicts)
+            self.stats.set("restarts", solver.restarts)
+            self.stats.set("learnt_clauses", solver.learnt_clauses)
+
+        def report_progress():
+            record()
+            self.progress(self.stats)
+
+        def is_exhausted():
+            self.limit_reached = self.limits.exceeded(self.started, solver.conflicts, len(solver.clauses),
+                                                      solver.literals)
+            return self.limit_reached is not None
+
+        # symbols of sliced clauses are numbered from 1, so solver does not decide symbols of other clauses
+        clauses, num_of_symbols = renumber(x.literals for x in kb_clauses + query_clauses)
+        solver = SATSolver(num_of_symbols)
+        if self.progress:
+            solver.progress = report_progress
+        if self.limits:
+            solver.stop = is_exhausted
+        for literals in clauses:
+            solver.add_clause(literals)
+
+        # search does not create resolution steps
+        self.steps_to_prove = []
+        is_satisfiable = solver.solve()
+        self.is_query_true = None if is_satisfiable is None else not is_satisfiable
+        record()
+
+    def _is_horn(self, query_clauses):
+        return self.compiled_knowledge_base.horn_solver() is not None and \
+            HornSolver.is_horn(x.literals for x in query_clauses)
 
+    def _prove_by_horn(self, kb_clauses, query_clauses):
+        # query is true if forward chaining on knowledge base and negation of query reaches clause without head
+        # knowledge base is saturated only once, negation of query adds its facts only till solver is reset
+        solver = self.compiled_knowledge_base.horn_solver()
+        try:
+            is_satisfiable = solver.solve([x.literals for x in query_clauses])
+            self.stats.set("horn_facts", len(solver.reasons))
+            self.is_query_true = not is_satisfiable
+            self.steps_to_prove = [] if is_satisfiable else self._horn_derivation(kb_clauses, query_clauses, solver)
+        finally:
+            solver.reset()
+
+    @staticmethod
+    def _horn_derivation(kb_clauses, query_clauses, solver):
+        # resolution steps of refutation, fact is derived by resolving its rule with facts of its body one by one
+        # only facts which are needed by clause of conflict are derived, so it costs size of proof not of knowledge base
+        def clause_of(i):
+            return kb_clauses[i] if i < len(kb_clauses) else query_clauses[i - len(kb_clauses)]
+
+        def resolve_body(clause):
+            for literal in clause.literals:
+                if literal < 0:
+                    pair = Pair(clause, facts[-literal])
+                    pair.resolve()
+                    steps.append(pair)
+                    clause = pair.resolvent
+            return clause
+
+        steps = []
+        facts = {}
+        # facts of body are derived before their head
+        conflict = clause_of(solver.conflict)
+        stack = [(-x, False) for x in conflict.literals]
+        while stack:
+            atom, is_expanded = stack.pop()
+            if atom in facts:
+                continue
+            rule = clause_of(solver.reasons[atom])
+            if is_expanded:
+                facts[atom] = resolve_body(rule)
+            else:
+                stack.append((atom, True))
+                stack.extend((-x, False) for x in rule.literals if x < 0 and -x not in facts)
+        resolve_body(conflict)
+        return steps
+
+    def _prove_by_2sat(self, kb_clauses, query_clauses):
+        # query is true if some literal implies its complement and complement implies the literal
         clauses = kb_clauses + query_clauses
-        # Execute till you find clauses
-        while True:
-            # find resolvable pair
-            pair = find_resolvable_pair(clauses, resolved_pairs)
-
-            # if we don't have pair then query is false
-            if not pair:
-                self.is_query_true = False
-                return
+        solver = TwoSATSolver([x.literals for x in clauses])
+        is_satisfiable = solver.solve()
+        self.stats.set("implication_edges", sum(len(x) for x in solver.graph.values()))
 
-            # resolve pair
-            pair.resolve()
+        self.is_query_true = not is_satisfiable
+        self.steps_to_prove = [] if is_satisfiable else self._2sat_derivation(clauses, solver)
 
-            # add pair to resolved pair
-            resolved_pairs.append(pair)
+    @staticmethod
+    def _2sat_derivation(clauses, solver):
+        # clauses on path of implications from literal to its complement are resolved one by one into unit clause
+        # of complement, the same is done for path back and both unit clauses contradict each other
+        def derive(start, end):
+            path = solver.path(start, end)
+            clause = clauses[path[0]]
+            for i in path[1:]:
+                if len(clause) == 1:
+                    break
+                pair = Pair(clause, clauses[i])
+                pair.resolve()
+                steps.append(pair)
+                clause = pair.resolvent
+            return clause
 
-            # add pair to steps of proof
-            self.steps_to_prove.append(pair)
+        steps = []
+        literal = solver.conflict
+        pair = Pair(derive(literal, -literal), derive(-literal, literal))
+        pair.resolve()
+        steps.append(pair)
+        return steps
+
+    def _simplify(self, kb_clauses, query_clauses, steps, derived_by):
+        # unit propagation till fixpoint and then pure literal elimination, satisfiability of clauses is not changed
+        # clause with true literal is removed and false literal is resolved away with unit clause
+        # returns remaining knowledge base and query clauses and pair which proves contradiction (or None)
+        clauses = kb_clauses + query_clauses
+        # negation of query and clauses resolved with it are set of support
+        support = [False] * len(kb_clauses) + [True] * len(query_clauses)
+        removed = [False] * len(clauses)
+        # literal -> indexes of clauses which have it and number of those which are not removed
+        occurrences = {}
+        counts = {}
+        for i, clause in enumerate(clauses):
+            for literal in clause.literals:
+                occurrences.setdefault(literal, []).append(i)
+                counts[literal] = counts.get(literal, 0) + 1
 
-            # does pair proves contradiction
+        # true literal -> unit clause which makes it true, and if that clause is in set of support
+        values = {}
+        is_support = {}
+        queue = []
+        num_of_removed = 0
+
+        def assign(i):
+            # returns pair which proves contradiction if complement of unit clause is already true
+            unit = clauses[i]
+            literal = unit.literals[0]
+            if literal in values:
+                return None
+            if -literal in values:
+                pair = Pair(unit, values[-literal])
+                pair.resolve()
+                return pair
+            values[literal] = unit
+            is_support[literal] = support[i]
+            queue.append(literal)
+            return None
+
+        def remove(i):
+            nonlocal num_of_removed
+            removed[i] = True
+            num_of_removed += 1
+            for x in clauses[i].literals:
+                counts[x] -= 1
+
+        for i, clause in enumerate(clauses):
+            if len(clause) == 1:
+                contradiction = assign(i)
+                if contradiction:
+                    return [], [], contradiction
+
+        while queue:
+            literal = queue.pop()
+            unit = values[literal]
+            # clauses with true literal are satisfied
+            for i in occurrences.pop(literal, []):
+                if not removed[i]:
+                    remove(i)
+            # false literal is resolved away
+            for i in occurrences.pop(-literal, []):
+                if removed[i]:
+                    continue
+                pair = Pair(clauses[i], unit)
+                pair.resolve()
+                steps.append(pair)
+                counts[-literal] -= 1
+                # clause resolved with unit of set of support joins it, this keeps set of support complete only if
+                # knowledge base is satisfiable, prover checks that before query is answered false
+                support[i] = support[i] or is_support[literal]
+                clauses[i] = pair.resolvent
+                if pair.resolvent not in derived_by:
+                    derived_by[pair.resolvent] = pair
+                if len(pair.resolvent) == 1:
+                    contradiction = assign(i)
+                    if contradiction:
+                        return [], [], contradiction
+
+        # literal whose complement is in no clause can be true, so clauses with it are removed
+        num_of_pure = 0
+        pure = list(counts)
+        while pure:
+            literal = pure.pop()
+            if counts.get(literal, 0) == 0 or counts.get(-literal, 0) != 0:
+                continue
+            num_of_pure += 1
+            for i in occurrences[literal]:
+                if not removed[i]:
+                    remove(i)
+                    # removed clause can make complements of its literals pure
+                    pure.extend(-x for x in clauses[i].literals if counts[x] == 0)
+
+        self.stats.set("propagated_units", len(values))
+        self.stats.set("pure_literals", num_of_pure)
+        self.stats.set("removed_clauses", num_of_removed)
+        kb_clauses = [x for x, r, s in zip(clauses, removed, support) if not r and not s]
+        query_clauses = [x for x, r, s in zip(clauses, removed, support) if not r and s]
+        return kb_clauses, query_clauses, None
+
+    def _prove_by_resolution(self, kb_clauses, query_clauses):
+        def keep(clause):
+            nonlocal duplicates, forward_subsumed, backward_subsumed, stored_literals
+            if clause in known_clauses:
+                duplicates += 1
+                return False
+
+            # forward subsumption: ignore clause if it is implied by already kept clause
+            if kept.find_subsuming(clause):
+                forward_subsumed += 1
+                return False
+
+            # backward subsumption: retire kept clauses which are implied by new clause
+            for other in kept.find_subsumed(clause):
+                backward_subsumed += 1
+                kept.remove(other)
+                if other in active:
+                    active.remove(other)
+                else:
+                    # passive clauses are removed when they are selected
+                    retired.add(other)
+
+            kept.add(clause)
+            known_clauses.add(clause)
+            stored_literals += len(clause)
+            return True
+
+        def add_to_passive(clause):
+            # shortest clause is selected first, we are preferring unit resolution
+            # clauses of the same length are selected in order in which they are added
+            nonlocal num_of_pushed
+            num_of_pushed += 1
+            heapq.heappush(passive, (len(clause), num_of_pushed, clause))
+
+        def saturate():
+            # set of support is complete only if knowledge base is satisfiable, otherwise (or if it is too hard to
+            # check) active clauses are given again, so knowledge base clauses are resolved with each other too
+            nonlocal is_saturated
+            if is_saturated or self.compiled_knowledge_base.relevance_graph().is_satisfiable() is True:
+                return False
+            is_saturated = True
+            self.stats.count("saturations")
+            for clause in list(active.clauses):
+                active.remove(clause)
+                add_to_passive(clause)
+            return bool(passive)
+
+        def derivation_of(pair):
+            # collect pairs whose resolvents are used to reach given pair
+            used = set()
+            stack = [pair]
+            while stack:
+                p = stack.pop()
+                if p in used:
+                    continue
+                used.add(p)
+                for element in [p.element1, p.element2]:
+                    if element in derived_by:
+                        stack.append(derived_by[element])
+            return [p for p in steps if p in used]
+
+        def record():
+            # counters are kept in local variables while proving, so they cost almost nothing
+            self.stats.set("given_clauses", given_clauses)
+            self.stats.set("pairs_tested", pairs_tested)
+            self.stats.set("resolvents", resolvents)
+            self.stats.set("tautologies", tautologies)
+            self.stats.set("duplicates", duplicates)
+            self.stats.set("forward_subsumed", forward_subsumed)
+            self.stats.set("backward_subsumed", backward_subsumed)
+            self.stats.set("retained_clauses", len(kept))
+
+        def stop(limit):
+            # limit is reached, keep steps done so far and leave result unknown
+            self.limit_reached = limit
+            self.steps_to_prove = steps
+            self.is_query_true = None
+            record()
+
+        given_clauses = pairs_tested = resolvents = tautologies = 0
+        duplicates = forward_subsumed = backward_subsumed = stored_literals = 0
+        # limits are checked before every pair only if any limit is set
+        limits = self.limits if self.limits else None
+
+        known_clauses = set()
+        # active and passive clauses which are not subsumed
+        kept = ClauseIndex()
+        retired = set()
+
+        # resolvents derived from knowledge base before are used like its clauses,
+        # they are part of proof if they are used
+        steps = []
+        derived_by = {}
+        retained = []
+        for pair in self.compiled_knowledge_base.retained_resolvents():
+            # knowledge base alone is contradiction, so every query follows from it
             if pair.is_contradict:
+                steps.append(pair)
+                self.steps_to_prove = derivation_of(pair)
                 self.is_query_true = True
+                record()
                 return
+            # first derivation of clause is used, later ones could be derived from it
+            if pair.resolvent in derived_by or pair.resolvent in self.compiled_knowledge_base.clause_indexes:
+                continue
+            derived_by[pair.resolvent] = pair
+            steps.append(pair)
+            retained.append(pair.resolvent)
+        if steps:
+            self.stats.set("retained_resolvents", len(steps))
+
+        # unit clauses are propagated before pairs are searched, only remaining clauses are resolved
+        kb_clauses, query_clauses, contradiction = self._simplify(kb_clauses + retained, query_clauses, steps,
+                                                                  derived_by)
+        if contradiction:
+            steps.append(contradiction)
+            self.steps_to_prove = derivation_of(contradiction)
+            self.is_query_true = True
+            record()
+            return
+
+        # knowledge base clauses are active from the beginning
+        active = ClauseIndex()
+        for clause in kb_clauses:
+            if keep(clause):
+                active.add(clause)
+
+        is_saturated = False
+        num_of_pushed = 0
+
+        # negation of query is set of support, only clauses derived from it are resolved
+        passive = []
+        for clause in query_clauses:
+            if keep(clause):
+                add_to_passive(clause)
+
+        # Execute till set of support is exhausted
+        while passive or saturate():
+            _, _, given = heapq.heappop(passive)
+            if given in retired:
+                continue
+
+            given_clauses += 1
+            if self.progress and given_clauses % self.PROGRESS_INTERVAL == 0:
+                record()
+                self.progress(self.stats)
+
+            # resolve given clause with each active clause exactly once
+            for clause in active.resolvable_with(given):
+                # given clause is subsumed by one of its resolvents
+                if given in retired:
+                    break
+                # active clause is subsumed by one of the resolvents
+                if clause not in active:
+                    continue
+
+                if limits is not None:
+                    limit = limits.exceeded(self.started, pairs_tested, len(known_clauses), stored_literals)
+                    if limit:
+                        stop(limit)
+                        return
+
+                pair = Pair(given, clause)
+                pair.resolve()
+                pairs_tested += 1
+
+                # does pair proves contradiction
+                if pair.is_contradict:
+                    steps.append(pair)
+                    self.steps_to_prove = derivation_of(pair)
+                    self.is_query_true = True
+                    record()
+                    return
+
+                if pair.resolvent:
+                    resolvents += 1
+                else:
+                    tautologies += 1
+
+                # add resolvent to passive clauses if it is not subsumed
+                if pair.resolvent and keep(pair.resolvent):
+                    add_to_passive(pair.resolvent)
+                    derived_by[pair.resolvent] = pair
+                    steps.append(pair)
+
+            if given not in retired:
+                active.add(given)
 
-            # add resolvent to query clause if already not present
-            if pair.resolvent and pair.resolvent not in clauses:
-                clauses.append(pair.resolvent)
+        # if we don't have pair then query is false
+        self.steps_to_prove = steps
+        self.is_query_true = False
+        record()
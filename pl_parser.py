@@ -1,15 +1,21 @@
-from pl_logic import PLLogicProblem
-from operations import BinaryOperation, UnaryOperation, Operand
+import re
+
+from pl_logic import PLLogicProblem, KnowledgeBase
+from operations import UnaryOperation, Operand, NARY_OPERATIONS, create_operation
+from stats import Stats
 
 
 class FormulaParser(object):
     """
-    Will store formula as a BinaryOperation or as a UnaryOperation or as Operand
+    Will store formula as a BinaryOperation, NaryOperation (And, Or), UnaryOperation or as Operand
     """
     OPEN_PARENTHESIS = "("
     CLOSE_PARENTHESIS = ")"
     BINARY_OPERATORS = ["|", "&", ">", "="]
     UNARY_OPERATORS = ["!"]
+    OPERATORS = BINARY_OPERATORS + UNARY_OPERATORS + [OPEN_PARENTHESIS, CLOSE_PARENTHESIS]
+    # symbol or any other non space character
+    TOKEN = re.compile(r"([A-Za-z0-9_]+)|(\S)")
     PRECEDENCE = {
         "!": 5,
         "&": 4,
@@ -22,13 +28,11 @@ class FormulaParser(object):
     formula = None
 
     def __init__(self, formula):
-        # first remove additional space from formula
-        formula = "".join(formula.split())
-        self.str_formula = formula
+        self.str_formula = formula.strip()
 
-        # convert formula to  postfix and then evaluate it
-        postfix = self._convert_to_postfix(self.str_formula)
-        self.formula = self._parse_postfix(postfix)
+        # split formula to tokens and then evaluate it considering precedence
+        tokens = self._tokenize(self.str_formula)
+        self.formula = self._parse_tokens(tokens)
 
     def _parse(self, string):
         # not useful as it does not consider precedence into considerations
@@ -71,81 +75,119 @@ class FormulaParser(object):
             if len(strings) == 1:
                 return self._parse(string[1:-1])
             elif len(strings) == 3:
-                return BinaryOperation(strings[1], self._parse(strings[0]), self._parse(strings[2]))
+                return create_operation(strings[1], self._parse(strings[0]), self._parse(strings[2]))
             else:
                 raise Exception("Parsing Error: Provide valid input")
 
         # if first is character then two scenario
         # eg. E>F, E=()
-        return BinaryOperation(string[1], self._parse(string[0]), self._parse(string[2:]))
-
-    def _parse_postfix(self, postfix):
-        stack = []
-        for char in postfix:
-            # if char is unary operation then top element is dummy element
-            # replace top two elements by Unary(!, A)
-            if char in self.UNARY_OPERATORS:
-                left_operand = stack[-2]
-                stack = stack[:-2]
-                stack.append(UnaryOperation(char, left_operand))
-            # if operator is binary, top element is right operand top to second is left
-            elif char in self.BINARY_OPERATORS:
-                left_operand = stack[-2]
-                right_operand = stack[-1]
-                stack = stack[:-2]
-                stack.append(BinaryOperation(char, left_operand, right_operand))
-            else:
-                # append character as Operand
-                stack.append(Operand(char))
-        # return top element as stack
-        return stack[-1]
-
-    def _convert_to_postfix(self, string):
-        ret = ""
-        stack = [None]
-        for char in string:
-            # If character is open parenthesis
-            if char == self.OPEN_PARENTHESIS:
-                stack.append(self.OPEN_PARENTHESIS)
-
-            # Character is close parenthesis
-            elif char == self.CLOSE_PARENTHESIS:
-                while stack[-1] and stack[-1] != self.OPEN_PARENTHESIS:
-                    c = stack.pop()
-                    if c in self.UNARY_OPERATORS:
-                        # add X as dummy right operand
-                        ret += f'X{c}'
-                    else:
-                        ret += c
-                if stack[-1] == self.OPEN_PARENTHESIS:  # or it can be none
-                    _ = stack.pop()
-
-            # Character is operator
-            elif char in self.BINARY_OPERATORS or char in self.UNARY_OPERATORS:
-                # <= condition maintains left to right associativity
-                while stack[-1] and self.PRECEDENCE[char] <= self.PRECEDENCE.get(stack[-1], -1):
-                    c = stack.pop()
-                    if c in self.UNARY_OPERATORS:
-                        # add X as additional right operand
-                        ret += f'X{c}'
+        return create_operation(string[1], self._parse(string[0]), self._parse(string[2:]))
+
+    def _tokenize(self, string):
+        # symbols can have multiple characters eg. valve_3_open, everything else is a single character token
+        tokens = []
+        for match in self.TOKEN.finditer(string):
+            symbol, other = match.groups()
+            if symbol:
+                tokens.append(symbol)
+            elif other:
+                if other not in self.OPERATORS:
+                    raise Exception(f"Parsing Error: Unexpected character '{other}' in {string}")
+                tokens.append(other)
+        return tokens
+
+    def _parse_tokens(self, tokens):
+        # single pass operator precedence parser, operands and operators are kept in separate stacks
+        # arities stores number of operands of each operator, chain like A&B&C is one operation
+        # conjunction and disjunction are kept on operand stack as (operator, list of operands) until other operator
+        # uses them, so nested chain like ((A&B)&C)&D collects its operands in one list and creates one node
+        operands = []
+        operators = []
+        arities = []
+
+        def create(operand):
+            if type(operand) is tuple:
+                operator, items = operand
+                return NARY_OPERATIONS[operator](items)
+            return operand
+
+        def reduce():
+            operator = operators.pop()
+            arity = arities.pop()
+            if operator in self.UNARY_OPERATORS:
+                operands.append(UnaryOperation(operator, create(operands.pop())))
+            elif operator in NARY_OPERATIONS:
+                parts = operands[-arity:]
+                del operands[-arity:]
+                # operands of shorter lists of same operator are added to the longest one
+                items = []
+                for part in parts:
+                    if type(part) is tuple and part[0] == operator and len(part[1]) > len(items):
+                        items = part[1]
+                for part in parts:
+                    if type(part) is tuple and part[0] == operator:
+                        if part[1] is not items:
+                            items += part[1]
                     else:
-                        ret += c
-                stack.append(char)
+                        items.append(create(part))
+                operands.append((operator, items))
+            else:
+                right_operand = create(operands.pop())
+                left_operand = create(operands.pop())
+                operands.append(create_operation(operator, left_operand, right_operand))
+
+        expect_operand = True
+        for token in tokens:
+            if expect_operand:
+                # unary operator and open parenthesis are applied after their operand is parsed
+                if token in self.UNARY_OPERATORS or token == self.OPEN_PARENTHESIS:
+                    operators.append(token)
+                    arities.append(1)
+                elif token not in self.OPERATORS:
+                    operands.append(Operand(token))
+                    expect_operand = False
+                else:
+                    raise Exception(f"Parsing Error: Expected symbol but found '{token}'")
+
+            elif token == self.CLOSE_PARENTHESIS:
+                while operators and operators[-1] != self.OPEN_PARENTHESIS:
+                    reduce()
+                if not operators:
+                    raise Exception("Parsing Error: Unbalanced parenthesis")
+                operators.pop()
+                arities.pop()
+
+            elif token in self.BINARY_OPERATORS:
+                # >= condition maintains left to right associativity
+                is_chained = False
+                while operators and operators[-1] != self.OPEN_PARENTHESIS and \
+                        self.PRECEDENCE[operators[-1]] >= self.PRECEDENCE[token]:
+                    # A&B&C, one more operand for same operation
+                    if operators[-1] == token and token in NARY_OPERATIONS:
+                        is_chained = True
+                        break
+                    reduce()
+
+                if is_chained:
+                    arities[-1] += 1
+                else:
+                    operators.append(token)
+                    arities.append(2)
+                expect_operand = True
 
-            # Character is Symbol
             else:
-                ret += char
+                raise Exception(f"Parsing Error: Expected operator but found '{token}'")
+
+        if expect_operand:
+            raise Exception("Parsing Error: Formula is incomplete")
 
         # apply rest of operator
-        while stack[-1]:
-            c = stack.pop()
-            if c in self.UNARY_OPERATORS:
-                # add X as additional right operand
-                ret += f'X{c}'
-            else:
-                ret += c
+        while operators:
+            if operators[-1] == self.OPEN_PARENTHESIS:
+                raise Exception("Parsing Error: Unbalanced parenthesis")
+            reduce()
 
-        return ret
+        return create(operands[-1])
 
     def __repr__(self):
         return repr(self.formula)
@@ -158,21 +200,75 @@ class Parser(object):
     """
     Class to convert input into valid PL Logic problem
     """
+    # optional words after mode on first line, word -> (argument of PLLogicProblem, value)
+    OPTIONS = {
+        "classic": ("cnf", "classic"),
+        "tseitin": ("cnf", "tseitin"),
+        "resolution": ("prover", "resolution"),
+        "sat": ("prover", "sat"),
+        "table": ("prover", "table"),
+    }
+
     pl_logic_problem = None
 
-    def __init__(self, problem):
-        mode = int(problem[0].split()[1])
+    def __init__(self, problem, knowledge_bases=None, progress=None, limits=None, cache=None):
+        # knowledge_bases: optional dict which stores compiled knowledge bases, problems with same formulas share it
+        # progress: optional function which is called with stats of problem while proving
+        # limits: optional Limits of prover
+        # cache: optional CNFCache, compiled knowledge bases are loaded from disk instead of converting them again
+        stats = Stats()
+        header = problem[0].split()
+        mode = int(header[1])
+        options = {}
+        for word in header[2:]:
+            if word not in self.OPTIONS:
+                raise Exception(f"Parsing Error: unknown option {word}")
+            key, value = self.OPTIONS[word]
+            options[key] = value
         formulas = problem[1:-1]
         query = problem[-1]
 
-        knowledge_base = []
+        cnf = options.pop("cnf", "classic")
+        key = (tuple("".join(formula.split()) for formula in formulas), cnf)
+
+        if knowledge_bases is not None and key in knowledge_bases:
+            # most recently used knowledge base is kept at the end
+            knowledge_base = knowledge_bases.pop(key)
+            stats.count("reused_knowledge_bases")
+        else:
+            knowledge_base = self._compile(formulas, cnf, cache, stats)
+
+        if knowledge_bases is not None:
+            knowledge_bases[key] = knowledge_base
+
+        with stats.phase("parse"):
+            query = FormulaParser(query)
+        self.pl_logic_problem = PLLogicProblem(knowledge_base, query, mode, stats=stats, progress=progress,
+                                               limits=limits, **options)
+
+    @staticmethod
+    def _compile(formulas, cnf, cache, stats):
+        def parse():
+            return [FormulaParser(formula) for formula in formulas]
 
-        for formula in formulas:
-            parsed_formula = FormulaParser(formula)
-            knowledge_base.append(parsed_formula)
+        # knowledge base from cache is used without parsing, formulas are parsed only if they are printed
+        if cache is not None:
+            key = cache.key(formulas, cnf)
+            with stats.phase("cache"):
+                knowledge_base = cache.load(key, len(formulas), cnf, parse)
+            if knowledge_base is not None:
+                stats.count("cache_hits")
+                return knowledge_base
+            stats.count("cache_misses")
 
-        query = FormulaParser(query)
-        self.pl_logic_problem = PLLogicProblem(knowledge_base, query, mode)
+        with stats.phase("parse"):
+            parsed_formulas = parse()
+        knowledge_base = KnowledgeBase(parsed_formulas, cnf)
+        stats.merge(knowledge_base.stats)
+        if cache is not None:
+            with stats.phase("cache"):
+                cache.store(key, knowledge_base)
+        return knowledge_base
 
     def get_parsed_pl_problem(self):
         return self.pl_logic_problem
@@ -0,0 +1,123 @@
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+
+from pl_parser import Parser
+from stats import Stats
+
+
+def solve_strategy(connection, problem, limits=None, cache=None):
+    # runs in process of strategy, sends (verdict, result, name of reached limit, stats, error) to parent
+    try:
+        pl_problem = Parser(problem, limits=limits, cache=cache).get_parsed_pl_problem()
+        message = (pl_problem.verdict(), pl_problem.get_result(), pl_problem.limit_reached, pl_problem.stats, None)
+    except Exception as e:
+        message = (None, None, None, None, str(e))
+    try:
+        connection.send(message)
+    finally:
+        connection.close()
+
+
+class Portfolio(object):
+    """
+    Races strategies on one problem, every strategy is solved in its own process
+    The first result which is 1 or 0 wins and processes of other strategies are stopped, result is unknown only if
+    every strategy reaches a limit
+    Strategy is option words of input format which are added after options of problem, eg. "tseitin sat"
+    """
+    DEFAULT_STRATEGIES = ["resolution", "sat", "tseitin sat"]
+    # seconds which strategies get after time limit to stop by themselves, then they are killed
+    KILL_GRACE = 1.0
+
+    strategies = None
+    limits = None
+    cache = None
+
+    def __init__(self, strategies=None, limits=None, cache=None):
+        # strategies: list of option words, limits: optional Limits of every strategy, cache: optional CNFCache
+        self.strategies = list(strategies) if strategies is not None else list(self.DEFAULT_STRATEGIES)
+        if not self.strategies:
+            raise Exception("Portfolio Error: at least one strategy is needed")
+        for strategy in self.strategies:
+            for word in strategy.split():
+                if word not in Parser.OPTIONS:
+                    raise Exception(f"Portfolio Error: unknown option {word} in strategy '{strategy}'")
+        self.limits = limits
+        self.cache = cache
+
+    @staticmethod
+    def parse_strategies(text):
+        # "resolution,tseitin sat" -> ["resolution", "tseitin sat"]
+        return [" ".join(x.split()) for x in text.split(",") if x.strip()]
+
+    def solve(self, problem):
+        # returns (winning strategy, result, stats), winning strategy is None if result is unknown
+        started = time.perf_counter()
+        deadline = None
+        if self.limits is not None and self.limits.time is not None:
+            deadline = started + self.limits.time + self.KILL_GRACE
+
+        processes = []
+        # reader of pipe -> index of strategy
+        readers = {}
+        try:
+            for i, strategy in enumerate(self.strategies):
+                reader, writer = multiprocessing.Pipe(duplex=False)
+                header = f"{problem[0]} {strategy}"
+                process = multiprocessing.Process(target=solve_strategy, daemon=True,
+                                                  args=(writer, [header] + problem[1:], self.limits, self.cache))
+                process.start()
+                # reader gets EOFError when process ends without result
+                writer.close()
+                processes.append(process)
+                readers[reader] = i
+
+            winner, result, stats = self._race(readers, deadline)
+        finally:
+            # losers are stopped, they have nothing which should be kept
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join()
+            for reader in readers:
+                reader.close()
+
+        stats.add_time("race", time.perf_counter() - started)
+        stats.set("portfolio_strategies", len(self.strategies))
+        return winner, result, stats
+
+    def _race(self, readers, deadline):
+        unknown = None
+        error = None
+        pending = dict(readers)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            ready = wait(list(pending), timeout)
+            if not ready:
+                # strategies which did not stop after time limit, eg. in CNF conversion
+                break
+            for reader in ready:
+                strategy = self.strategies[pending.pop(reader)]
+                try:
+                    verdict, result, limit_reached, stats, message = reader.recv()
+                except EOFError:
+                    verdict, result, limit_reached, stats = None, None, None, None
+                    message = f"Portfolio Error: strategy '{strategy}' ended unexpectedly"
+
+                if verdict in ("1", "0"):
+                    return strategy, result, stats
+                if message is not None:
+                    error = error or message
+                elif unknown is None:
+                    unknown = (None, result, stats)
+
+        if unknown is not None:
+            return unknown
+        if error is not None and not pending:
+            # eg. parsing error which is the same for every strategy
+            raise Exception(error)
+        stats = Stats()
+        stats.count("portfolio_timeouts")
+        return None, "unknown", stats
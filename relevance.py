@@ -0,0 +1,96 @@
+from clauses import renumber
+from sat_solver import SATSolver
+
+
+class RelevanceGraph(object):
+    """
+    Symbols of clauses connected by clauses which have them together, clauses of component which shares no symbol
+    with query can not be resolved with it, so only components of query symbols are given to prover
+    Component which is unsatisfiable makes every query true, so component is left out only if it is satisfiable
+    """
+    # conflicts of SAT search which decides if component is satisfiable, undecided component is never left out
+    MAX_CONFLICTS = 1000
+
+    clauses = None
+    # symbol -> parent symbol, root symbol is id of its component
+    parents = None
+    # root symbol -> indexes of clauses of component in order of clauses
+    components = None
+    # root symbol -> True if component is satisfiable, False if it is not and None if check is undecided
+    satisfiable = None
+    # roots of components which are not checked by slice yet and of those which are not satisfiable (or undecided)
+    unchecked = None
+    kept = None
+
+    def __init__(self, clauses):
+        # clauses: lists of signed integer literals
+        self.clauses = clauses
+        self.parents = {}
+        for literals in clauses:
+            root = self.find(abs(literals[0]))
+            for literal in literals[1:]:
+                other = self.find(abs(literal))
+                if other != root:
+                    self.parents[other] = root
+
+        self.components = {}
+        for i, literals in enumerate(clauses):
+            self.components.setdefault(self.find(abs(literals[0])), []).append(i)
+        self.satisfiable = {}
+        self.unchecked = set(self.components)
+        self.kept = []
+
+    def find(self, symbol):
+        # root of symbol with path halving, new symbol is its own component
+        parents = self.parents
+        parent = parents.setdefault(symbol, symbol)
+        while parent != symbol:
+            grandparent = parents[parent]
+            parents[symbol] = grandparent
+            symbol, parent = grandparent, parents[grandparent]
+        return symbol
+
+    def slice(self, symbols):
+        # returns indexes of clauses (in order) which can be used to prove query with given symbols
+        roots = {self.find(x) for x in symbols if x in self.parents}
+        for root in list(self.unchecked - roots):
+            self.unchecked.discard(root)
+            if self._check(root) is not True:
+                self.kept.append(root)
+        roots.update(self.kept)
+        if len(roots) == len(self.components):
+            return list(range(len(self.clauses)))
+        return sorted(i for root in roots for i in self.components[root])
+
+    def is_satisfiable(self):
+        # True if every component is satisfiable, False if one of them is not and None if some check is undecided
+        ret = True
+        for root in self.components:
+            result = self._check(root)
+            if result is False:
+                return False
+            if result is None:
+                ret = None
+        return ret
+
+    def _check(self, root):
+        # satisfiability of component is computed once
+        if root not in self.satisfiable:
+            self.satisfiable[root] = self._is_satisfiable(self.components[root])
+        return self.satisfiable[root]
+
+    def _is_satisfiable(self, indexes):
+        # clauses are satisfied when every symbol is true (or every symbol is false) if each of them has positive
+        # (negative) literal, most components of independent facts and rules are decided so without search
+        if all(any(x > 0 for x in self.clauses[i]) for i in indexes) or \
+                all(any(x < 0 for x in self.clauses[i]) for i in indexes):
+            return True
+
+        # symbols of component are numbered from 1, so solver does not allocate every symbol of knowledge base
+        clauses, num_of_symbols = renumber(self.clauses[i] for i in indexes)
+        solver = SATSolver(num_of_symbols)
+        solver.stop = lambda: solver.conflicts >= self.MAX_CONFLICTS
+        for clause in clauses:
+            if not solver.add_clause(clause):
+                return False
+        return solver.solve()
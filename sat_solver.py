@@ -0,0 +1,294 @@
+import heapq
+
+
+class SATSolver(object):
+    """
+    CDCL satisfiability solver for clauses of signed integer literals (symbol ids start from 1)
+    Uses unit propagation with two watched literals, first UIP clause learning, VSIDS branching and restarts
+    """
+    ACTIVITY_DECAY = 0.95
+    ACTIVITY_LIMIT = 1e100
+    FIRST_RESTART = 100
+    RESTART_GROWTH = 1.5
+
+    num_of_symbols = None
+    clauses = None
+    watches = None
+    is_conflicting = None
+
+    # assignment
+    values = None
+    levels = None
+    reasons = None
+    trail = None
+    trail_limits = None
+    propagated = None
+
+    # branching heuristic
+    activity = None
+    activity_increment = None
+    order = None
+    phases = None
+
+    # statistics
+    decisions = None
+    conflicts = None
+    restarts = None
+    learnt_clauses = None
+    # number of literals in attached clauses
+    literals = None
+
+    # optional function which is called on every restart
+    progress = None
+    # optional function which is called after every conflict, decision and restart, search is stopped if it returns True
+    stop = None
+
+    def __init__(self, num_of_symbols):
+        n = num_of_symbols + 1
+        self.num_of_symbols = num_of_symbols
+        self.clauses = []
+        self.watches = {}
+        self.is_conflicting = False
+
+        self.values = [0] * n
+        self.levels = [0] * n
+        self.reasons = [None] * n
+        self.trail = []
+        self.trail_limits = []
+        self.propagated = 0
+
+        self.activity = [0.0] * n
+        self.activity_increment = 1.0
+        self.order = [(0.0, x) for x in range(1, n)]
+        self.phases = [False] * n
+
+        self.decisions = 0
+        self.conflicts = 0
+        self.restarts = 0
+        self.learnt_clauses = 0
+        self.literals = 0
+
+    def value(self, literal):
+        # 1 if literal is true, -1 if it is false and 0 if it is unassigned
+        v = self.values[abs(literal)]
+        return v if literal > 0 else -v
+
+    def add_clause(self, literals):
+        # clauses must be added before solving, returns False if clause set becomes unsatisfiable
+        if self.is_conflicting:
+            return False
+
+        clause = []
+        for literal in literals:
+            # clause is tautology
+            if -literal in clause:
+                return True
+            if literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.is_conflicting = True
+        elif len(clause) == 1:
+            if self.value(clause[0]) == -1:
+                self.is_conflicting = True
+            elif self.value(clause[0]) == 0:
+                self._assign(clause[0], None)
+        else:
+            self._attach(clause)
+        return not self.is_conflicting
+
+    def solve(self):
+        # returns True if clauses are satisfiable, None if search is stopped
+        if self.is_conflicting or self._propagate() is not None:
+            self.is_conflicting = True
+            return False
+
+        restart_limit = self.FIRST_RESTART
+        conflicts_since_restart = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_since_restart += 1
+
+                # conflict without any decision, clauses are unsatisfiable
+                if not self.trail_limits:
+                    self.is_conflicting = True
+                    return False
+
+                learnt, level = self._analyze(conflict)
+                self.learnt_clauses += 1
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self._attach(learnt)
+                    self._assign(learnt[0], learnt)
+                self._decay_activity()
+                if self.stop and self.stop():
+                    return None
+                continue
+
+            if conflicts_since_restart >= restart_limit:
+                conflicts_since_restart = 0
+                restart_limit = int(restart_limit * self.RESTART_GROWTH)
+                self.restarts += 1
+                self._backtrack(0)
+                if self.progress:
+                    self.progress()
+                if self.stop and self.stop():
+                    return None
+                continue
+
+            symbol = self._pick_branching_symbol()
+            if not symbol:
+                # every symbol is assigned without conflict
+                return True
+            # search without conflicts is stopped too
+            if self.stop and self.stop():
+                return None
+
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self._assign(symbol if self.phases[symbol] else -symbol, None)
+
+    def model(self):
+        # symbol id -> truth value of last satisfying assignment
+        return {x: self.values[x] > 0 for x in range(1, self.num_of_symbols + 1)}
+
+    def _attach(self, clause):
+        # first two literals of clause are watched
+        self.clauses.append(clause)
+        self.literals += len(clause)
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def _assign(self, literal, reason):
+        symbol = abs(literal)
+        self.values[symbol] = 1 if literal > 0 else -1
+        self.levels[symbol] = len(self.trail_limits)
+        self.reasons[symbol] = reason
+        self.trail.append(literal)
+
+    def _propagate(self):
+        # returns conflicting clause if any
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+
+            watchers = self.watches.get(false_literal, [])
+            i = 0
+            while i < len(watchers):
+                clause = watchers[i]
+
+                # make sure false literal is second watched literal
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                # clause is already satisfied by other watched literal
+                if self.value(clause[0]) == 1:
+                    i += 1
+                    continue
+
+                # look for new literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        watchers[i] = watchers[-1]
+                        watchers.pop()
+                        break
+                else:
+                    # clause is unit or conflicting
+                    if self.value(clause[0]) == -1:
+                        self.propagated = len(self.trail)
+                        return clause
+                    self._assign(clause[0], clause)
+                    i += 1
+        return None
+
+    def _analyze(self, conflict):
+        # first UIP learning, returns learnt clause (asserting literal first) and level to backtrack
+        current_level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        counter = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        literal = None
+
+        while True:
+            for q in clause:
+                if q == literal:
+                    continue
+                symbol = abs(q)
+                if symbol in seen or self.levels[symbol] == 0:
+                    continue
+                seen.add(symbol)
+                self._bump_activity(symbol)
+                if self.levels[symbol] == current_level:
+                    counter += 1
+                else:
+                    learnt.append(q)
+
+            # select next literal of current level from trail
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reasons[abs(literal)]
+            counter -= 1
+            if counter == 0:
+                break
+
+        learnt[0] = -literal
+
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # literal of highest level is watched together with asserting literal
+        highest = max(range(1, len(learnt)), key=lambda x: self.levels[abs(learnt[x])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def _backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            symbol = abs(literal)
+            self.phases[symbol] = literal > 0
+            self.values[symbol] = 0
+            self.reasons[symbol] = None
+            heapq.heappush(self.order, (-self.activity[symbol], symbol))
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.propagated = len(self.trail)
+
+    def _pick_branching_symbol(self):
+        # unassigned symbol with highest activity, outdated heap entries are skipped
+        while self.order:
+            activity, symbol = heapq.heappop(self.order)
+            if self.values[symbol] == 0 and -activity == self.activity[symbol]:
+                return symbol
+        # heap entries can be outdated for unassigned symbols, scan them
+        for symbol in range(1, self.num_of_symbols + 1):
+            if self.values[symbol] == 0:
+                return symbol
+        return None
+
+    def _bump_activity(self, symbol):
+        self.activity[symbol] += self.activity_increment
+        if self.activity[symbol] > self.ACTIVITY_LIMIT:
+            # rescale every activity to avoid overflow
+            for x in range(1, self.num_of_symbols + 1):
+                self.activity[x] *= 1 / self.ACTIVITY_LIMIT
+            self.activity_increment *= 1 / self.ACTIVITY_LIMIT
+            self.order = [(-self.activity[x], x) for x in range(1, self.num_of_symbols + 1) if self.values[x] == 0]
+            heapq.heapify(self.order)
+        elif self.values[symbol] == 0:
+            heapq.heappush(self.order, (-self.activity[symbol], symbol))
+
+    def _decay_activity(self):
+        self.activity_increment /= self.ACTIVITY_DECAY
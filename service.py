@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import solver
+from cnf_cache import CNFCache
+from limits import Limits
+
+# seconds which worker gets after timeout of request to stop by itself, then it is killed
+KILL_GRACE = 1.0
+# requests which are read but not answered yet, reading waits when there are more
+MAX_PENDING = 1024
+# bytes of one request line read from socket
+MAX_LINE = 64 * 1024 * 1024
+
+
+def solve(problem, limits=None, cache=None, show_stats=False):
+    # runs in worker process, compiled knowledge bases of solver are kept there between requests
+    pl_problem = solver.solve_problem(problem, limits, cache)
+    response = {"result": pl_problem.get_result()}
+    if pl_problem.limit_reached:
+        response["limit"] = pl_problem.limit_reached
+    if show_stats:
+        response["stats"] = pl_problem.stats.to_dict()
+    return response
+
+
+class Worker(object):
+    """
+    Process which solves one request at a time, it remembers which knowledge bases it has compiled
+    """
+    executor = None
+    pid = None
+    # keys of knowledge bases of worker in order of use
+    keys = None
+
+    def __init__(self):
+        self.keys = {}
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.keys = {}
+        # process id is needed to kill worker which does not stop in time
+        self.pid = await loop.run_in_executor(self.executor, os.getpid)
+
+    async def run(self, key, timeout, function, *args):
+        if self.executor is None:
+            await self.start()
+
+        self.keys.pop(key, None)
+        self.keys[key] = True
+        if len(self.keys) > solver.MAX_KNOWLEDGE_BASES:
+            self.keys.pop(next(iter(self.keys)))
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self.executor, function, *args), timeout)
+        except asyncio.TimeoutError:
+            # running call can not be cancelled, so process is killed and started again for next request
+            self.stop(kill=True)
+            raise
+        except BrokenProcessPool:
+            self.stop()
+            raise Exception("Worker Error: worker process ended unexpectedly")
+
+    def stop(self, kill=False):
+        if self.executor is None:
+            return
+        if kill:
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.executor.shutdown(wait=not kill)
+        self.executor = None
+
+
+class WorkerPool(object):
+    """
+    Idle workers, request goes to worker which has compiled its knowledge base if such worker is idle
+    otherwise to worker which is idle for the longest time
+    """
+    workers = None
+    idle = None
+    condition = None
+
+    def __init__(self, size):
+        self.workers = [Worker() for _ in range(size)]
+        self.idle = list(self.workers)
+
+    async def start(self):
+        # condition is created in running event loop
+        self.condition = asyncio.Condition()
+        await asyncio.gather(*[worker.start() for worker in self.workers])
+
+    async def run(self, key, timeout, function, *args):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.idle)
+            worker = next((x for x in self.idle if key in x.keys), self.idle[0])
+            self.idle.remove(worker)
+        try:
+            return await worker.run(key, timeout, function, *args)
+        finally:
+            async with self.condition:
+                self.idle.append(worker)
+                self.condition.notify()
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
+
+
+class Service(object):
+    """
+    Resident prover which answers requests in JSON lines, one request or response per line
+    Request: {"id": 1, "problem": ["2 0", "A>B", "A", "B"], "timeout": 5, "stats": true}, problem is in input format
+    of main.py as list of lines or text, timeout and stats are optional
+    Response: {"id": 1, "result": "1"}, with "limit" if result is unknown and "error" if request is wrong
+    Responses are written as soon as they are ready, so their order can differ from order of requests
+    """
+    pool = None
+    # default seconds of one request, None means no timeout
+    timeout = None
+    cache = None
+
+    def __init__(self, jobs, timeout=None, cache=None):
+        self.pool = WorkerPool(jobs)
+        self.timeout = timeout
+        self.cache = cache
+
+    async def serve(self, socket_path=None):
+        await self.pool.start()
+        try:
+            if socket_path:
+                await self._serve_socket(socket_path)
+            else:
+                await self._serve_stdio()
+        finally:
+            self.pool.stop()
+
+    async def handle(self, line):
+        # returns response of one request line
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be JSON object")
+        except ValueError as e:
+            return {"id": None, "error": f"Request Error: {e}"}
+
+        response = {"id": request.get("id")}
+        try:
+            problem = self._read_problem(request.get("problem"))
+            timeout = request.get("timeout", self.timeout)
+            if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+                raise Exception("Request Error: timeout must be positive number of seconds")
+
+            # prover stops by itself when time limit is reached, worker is killed only if it does not stop
+            # eg. in CNF conversion which is not limited
+            key = (tuple(problem[0].split()[2:]), tuple("".join(x.split()) for x in problem[1:-1]))
+            limits = Limits(time=timeout)
+            deadline = timeout + KILL_GRACE if timeout is not None else None
+            response.update(await self.pool.run(key, deadline, solve, problem, limits, self.cache,
+                                                bool(request.get("stats"))))
+        except asyncio.TimeoutError:
+            response.update({"result": "unknown", "limit": "time"})
+        except Exception as e:
+            response["error"] = str(e)
+        return response
+
+    @staticmethod
+    def _read_problem(problem):
+        if isinstance(problem, str):
+            problem = problem.split("\n")
+        if not isinstance(problem, list) or not all(isinstance(x, str) for x in problem):
+            raise Exception("Request Error: problem must be text or list of lines")
+        problems = list(solver.divide_input(problem))
+        if len(problems) != 1:
+            raise Exception("Request Error: request must have exactly one problem")
+        return problems[0]
+
+    async def _serve_lines(self, readline, write):
+        # every request is answered in its own task, so slow request does not hold others
+        pending = asyncio.Semaphore(MAX_PENDING)
+        tasks = set()
+
+        async def answer(line):
+            try:
+                await write(json.dumps(await self.handle(line)) + "\n")
+            finally:
+                pending.release()
+
+        while True:
+            line = await readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            await pending.acquire()
+            task = asyncio.ensure_future(answer(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _serve_stdio(self):
+        # standard input is read in thread, it can be pipe, file or terminal
+        loop = asyncio.get_running_loop()
+
+        async def readline():
+            return await loop.run_in_executor(None, sys.stdin.readline)
+
+        async def write(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        await self._serve_lines(readline, write)
+
+    async def _serve_socket(self, path):
+        async def connection(reader, writer):
+            lock = asyncio.Lock()
+
+            async def write(text):
+                # client which has disconnected does not get its responses
+                async with lock:
+                    try:
+                        writer.write(text.encode())
+                        await writer.drain()
+                    except ConnectionError:
+                        pass
+
+            try:
+                await self._serve_lines(reader.readline, write)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(connection, path, limit=MAX_LINE)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            os.remove(path)
+
+
+def run(jobs=None, timeout=None, cache=None, socket_path=None):
+    service = Service(jobs or os.cpu_count() or 1, timeout, cache)
+    try:
+        asyncio.run(service.serve(socket_path))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Propositional logic prover service, requests and responses are "
+                                                     "JSON lines on standard input and output or on Unix socket")
+    arg_parser.add_argument("--socket", dest="socket_path", metavar="PATH", help="listen on Unix socket PATH")
+    arg_parser.add_argument("-j", "--jobs", type=int, help="number of worker processes (default: number of CPUs)")
+    arg_parser.add_argument("--timeout", type=float, help="default seconds of one request")
+    # compiled knowledge bases are kept on disk between runs
+    arg_parser.add_argument("--cache", metavar="DIR", help="folder of compiled knowledge bases")
+    arg_parser.add_argument("--cache-size", type=float, default=CNFCache.DEFAULT_MAX_SIZE / 1024 / 1024,
+                            help="megabytes of cache folder, least recently used files are removed "
+                                 "(default: %(default)s)")
+    args = arg_parser.parse_args()
+    cache = CNFCache(args.cache, int(args.cache_size * 1024 * 1024)) if args.cache else None
+    run(jobs=args.jobs, timeout=args.timeout, cache=cache, socket_path=args.socket_path)
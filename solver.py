@@ -0,0 +1,43 @@
+from pl_parser import Parser
+
+# number of compiled knowledge bases kept for problems which share formulas
+MAX_KNOWLEDGE_BASES = 16
+
+# compiled knowledge bases of this process
+knowledge_bases = {}
+
+
+def divide_input(lines):
+    # yield problems one by one, lines can be any iterable eg. list, opened file or stdin
+    lines = iter(lines)
+    for line in lines:
+        line = line.strip()
+        # if line is empty then ignore
+        if not line:
+            continue
+
+        # check number of line
+        problem = [line]
+        try:
+            num_of_lines = int(line.split()[0])
+        except ValueError as e:
+            raise Exception(f"Input Error: Provide number of line as integer, {e}")
+
+        # formulas and proposition
+        for _ in range(num_of_lines + 1):
+            next_line = next(lines, None)
+            if next_line is None:
+                raise Exception(f"Input Error: Input ended before problem '{line}' is completed")
+            problem.append(next_line.strip())
+
+        yield problem
+
+
+def solve_problem(problem, limits=None, cache=None):
+    # returns solved PLLogicProblem, compiled knowledge base is kept for next problems of this process
+    pl_problem = Parser(problem, knowledge_bases, limits=limits, cache=cache).get_parsed_pl_problem()
+
+    # forget least recently used knowledge base
+    if len(knowledge_bases) > MAX_KNOWLEDGE_BASES:
+        knowledge_bases.pop(next(iter(knowledge_bases)))
+    return pl_problem
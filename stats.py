@@ -0,0 +1,54 @@
+import contextlib
+import time
+
+
+class Stats(object):
+    """
+    Time spent in every phase and counters of prover, both are kept in order of first use
+    """
+    times = None
+    counters = None
+
+    def __init__(self):
+        self.times = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # time of with block is added to phase
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, phase, seconds):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def merge(self, other):
+        for phase, seconds in other.times.items():
+            self.add_time(phase, seconds)
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def total_time(self):
+        return sum(self.times.values())
+
+    def to_dict(self):
+        return {"times": dict(self.times), "counters": dict(self.counters), "total_time": self.total_time()}
+
+    def __str__(self):
+        ret = "Time:\n"
+        for phase, seconds in self.times.items():
+            ret += f"  {phase}: {seconds:.6f}s\n"
+        ret += f"  total: {self.total_time():.6f}s\n"
+        ret += "Counters:\n"
+        for name, value in self.counters.items():
+            ret += f"  {name}: {value}\n"
+        return ret.rstrip("\n")
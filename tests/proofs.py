@@ -0,0 +1,20 @@
+from clauses import Clause
+from pl_logic import Pair
+
+
+def check_proof(test, pl_problem):
+    # every step resolves clauses of knowledge base, negation of query or earlier resolvents on one literal,
+    # proof of true query ends with contradiction
+    known = set(pl_problem.compiled_knowledge_base.clauses)
+    known.update(Clause.compile(x, pl_problem.symbols) for x in pl_problem.segregated_query_clauses)
+    for pair in pl_problem.steps_to_prove:
+        test.assertIn(pair.element1, known)
+        test.assertIn(pair.element2, known)
+        expected = Pair(pair.element1, pair.element2)
+        expected.resolve()
+        test.assertEqual(pair.resolvent, expected.resolvent)
+        test.assertEqual(pair.is_contradict, expected.is_contradict)
+        if pair.resolvent is not None:
+            known.add(pair.resolvent)
+    if pl_problem.is_query_true:
+        test.assertTrue(pl_problem.steps_to_prove[-1].is_contradict)
@@ -0,0 +1,56 @@
+import time
+import unittest
+
+from cnf import CNFConverter
+from pl_parser import FormulaParser
+
+
+def alternating_chain(n):
+    # A1|(A2&(A3|(A4&...)))
+    text = f"A{n}"
+    for i in range(n - 1, 0, -1):
+        text = f"A{i}{'|' if i % 2 else '&'}({text})"
+    return FormulaParser(text).formula
+
+
+def convert(formula):
+    converter = CNFConverter()
+    started = time.perf_counter()
+    clauses = converter._clauses(formula, True)
+    return clauses, converter, time.perf_counter() - started
+
+
+class CNFConverterTest(unittest.TestCase):
+    def test_alternating_chain(self):
+        for n in [4, 5, 100]:
+            with self.subTest(n=n):
+                clauses, converter, _ = convert(alternating_chain(n))
+                # A1|A2, A1|A3|A4, A1|A3|A5|A6, ... and A1|A3|...|An if n is odd
+                odd = [f"A{i}" for i in range(1, n + 1, 2)]
+                expected = {frozenset(odd[:i // 2] + [f"A{i}"]) for i in range(2, n + 1, 2)}
+                if n % 2:
+                    expected.add(frozenset(odd))
+                self.assertEqual({frozenset(str(x) for x in clause) for clause in clauses}, expected)
+                self.assertEqual(len(clauses), len(expected))
+                # clauses of sub formulas are not kept after conversion
+                self.assertEqual(len(converter.converted), 1)
+
+    def test_alternating_chain_scaling(self):
+        # conversion of 4 times longer chain took about 60 times longer when clauses of every level were kept
+        # and every literal was hashed again for each level, now it takes 15 to 25 times longer
+        formulas = {n: alternating_chain(n) for n in [100, 400]}
+        times = {n: min(convert(formulas[n])[2] for _ in range(5)) for n in formulas}
+        self.assertLess(times[400], 40 * times[100], times)
+
+    def test_shared_sub_formula(self):
+        shared = alternating_chain(6)
+        parts = [f"X|({shared})", f"Y|!({shared})", f"Z|({shared})"]
+        clauses, converter, _ = convert(FormulaParser("&".join(f"({x})" for x in parts)).formula)
+        self.assertEqual(len(converter.converted), 1)
+        expected = {frozenset(x) for part in parts for x in convert(FormulaParser(part).formula)[0]}
+        self.assertEqual({frozenset(x) for x in clauses}, expected)
+        self.assertEqual(len(clauses), len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from cnf_cache import CNFCache
+from pl_logic import KnowledgeBase
+from pl_parser import FormulaParser, Parser
+
+
+FORMULAS = ["A>B", "B&C>D", "(A|E)=!F", "C"]
+QUERIES = ["D", "F", "!E|B", "G"]
+
+
+def parse(formulas):
+    return lambda: [FormulaParser(x) for x in formulas]
+
+
+class CNFCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CNFCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def store(self, formulas, cnf="classic"):
+        key = self.cache.key(formulas, cnf)
+        self.cache.store(key, KnowledgeBase(parse(formulas)(), cnf))
+        return key
+
+    def test_round_trip(self):
+        for cnf in ["classic", "tseitin"]:
+            with self.subTest(cnf=cnf):
+                knowledge_base = KnowledgeBase(parse(FORMULAS)(), cnf)
+                key = self.cache.key(FORMULAS, cnf)
+                self.cache.store(key, knowledge_base)
+                restored = self.cache.load(key, len(FORMULAS), cnf, parse(FORMULAS))
+                self.assertEqual(restored.symbols.names, knowledge_base.symbols.names)
+                self.assertEqual([x.literals for x in restored.clauses], [x.literals for x in knowledge_base.clauses])
+                self.assertEqual(restored.formula_clauses, knowledge_base.formula_clauses)
+                self.assertEqual(restored.clause_indexes, knowledge_base.clause_indexes)
+                self.assertEqual(restored.query_converter() is None, cnf == "classic")
+
+                # problems against restored knowledge base print the same proof
+                for query in QUERIES:
+                    problem = [f"{len(FORMULAS)} 1 {cnf}"] + FORMULAS + [query]
+                    expected = Parser(problem).get_parsed_pl_problem()
+                    pl_problem = Parser(problem, cache=self.cache).get_parsed_pl_problem()
+                    self.assertEqual(pl_problem.stats.counters["cache_hits"], 1)
+                    self.assertEqual(pl_problem.get_result(), expected.get_result())
+
+    def test_restored_knowledge_base_grows(self):
+        key = self.store(FORMULAS)
+        restored = self.cache.load(key, len(FORMULAS), "classic", parse(FORMULAS))
+        restored._add(parse(["A", "D>G"])())
+        self.assertEqual(len(restored.segregated_knowledge_base_clauses), len(restored.clauses))
+        self.assertEqual(restored.ask(FormulaParser("G")).verdict(), "1")
+
+    def test_different_formulas_are_not_loaded(self):
+        key = self.store(FORMULAS)
+        self.assertNotEqual(self.cache.key(FORMULAS, "tseitin"), key)
+        self.assertEqual(self.cache.key([" A > B"] + FORMULAS[1:], "classic"), key)
+        self.assertIsNone(self.cache.load(self.cache.key(FORMULAS[1:], "classic"), 3, "classic", parse(FORMULAS)))
+
+    def test_damaged_file(self):
+        for damage in ["magic", "truncated", "empty"]:
+            with self.subTest(damage=damage):
+                key = self.store(FORMULAS)
+                path = self.cache.path(key)
+                with open(path, "rb") as f:
+                    data = f.read()
+                if damage == "magic":
+                    data = b"X" + data[1:]
+                elif damage == "truncated":
+                    data = data[:len(data) - 8]
+                else:
+                    data = b""
+                with open(path, "wb") as f:
+                    f.write(data)
+
+                # damaged file is removed, so knowledge base is compiled and stored again
+                self.assertIsNone(self.cache.load(key, len(FORMULAS), "classic", parse(FORMULAS)))
+                self.assertFalse(os.path.exists(path))
+                problem = [f"{len(FORMULAS)} 0"] + FORMULAS + ["A>D"]
+                pl_problem = Parser(problem, cache=self.cache).get_parsed_pl_problem()
+                self.assertEqual(pl_problem.verdict(), "1")
+                self.assertEqual(pl_problem.stats.counters["cache_misses"], 1)
+                self.assertTrue(os.path.exists(path))
+
+    def test_least_recently_used_is_removed(self):
+        keys = [self.store(FORMULAS + [f"X{i}"]) for i in range(3)]
+        size = os.path.getsize(self.cache.path(keys[0]))
+        # explicit times, so order does not depend on resolution of file times
+        for i, key in enumerate(keys):
+            os.utime(self.cache.path(key), (1000 + i, 1000 + i))
+        # loading marks file as used
+        self.assertIsNotNone(self.cache.load(keys[0], len(FORMULAS) + 1, "classic", parse(FORMULAS + ["X0"])))
+
+        self.cache.max_size = 3 * size
+        key = self.store(FORMULAS + ["X3"])
+        remaining = {x for x in keys + [key] if os.path.exists(self.cache.path(x))}
+        self.assertEqual(remaining, {keys[0], keys[2], key})
+
+    def test_smaller_size_is_enforced_on_load(self):
+        keys = [self.store(FORMULAS + [f"X{i}"]) for i in range(3)]
+        for i, key in enumerate(keys):
+            os.utime(self.cache.path(key), (1000 + i, 1000 + i))
+        cache = CNFCache(self.directory.name, os.path.getsize(self.cache.path(keys[0])))
+        # loaded file is the most recently used one, so it is kept
+        self.assertIsNotNone(cache.load(keys[1], len(FORMULAS) + 1, "classic", parse(FORMULAS + ["X1"])))
+        self.assertEqual([os.path.exists(self.cache.path(x)) for x in keys], [False, True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
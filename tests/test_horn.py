@@ -0,0 +1,58 @@
+import unittest
+
+from horn import HornSolver
+from pl_logic import KnowledgeBase, PLLogicProblem
+from pl_parser import FormulaParser, Parser
+from proofs import check_proof
+
+
+def solve(formulas, query, mode=0):
+    return Parser([f"{len(formulas)} {mode}"] + formulas + [query]).get_parsed_pl_problem()
+
+
+class HornTest(unittest.TestCase):
+    FORMULAS = ["A", "B", "A&B>C", "C>D", "E>F", "D&F>G"]
+    # query -> verdict
+    QUERIES = {"D": "1", "C&D": "1", "F": "0", "G": "0", "E>G": "1", "!E": "0", "A>D": "1"}
+
+    def test_queries(self):
+        for query, expected in self.QUERIES.items():
+            with self.subTest(query=query):
+                pl_problem = solve(self.FORMULAS, query, 1)
+                self.assertEqual(pl_problem.verdict(), expected)
+                self.assertIn("horn_facts", pl_problem.stats.counters)
+                check_proof(self, pl_problem)
+
+    def test_inconsistent_knowledge_base(self):
+        # B>!A has no head, knowledge base proves every query
+        formulas = ["A", "A>B", "B>!A", "C>D"]
+        for query in ["Z", "!A", "D"]:
+            with self.subTest(query=query):
+                pl_problem = solve(formulas, query, 1)
+                self.assertEqual(pl_problem.verdict(), "1")
+                check_proof(self, pl_problem)
+
+    def test_knowledge_base_is_reused(self):
+        knowledge_base = KnowledgeBase([FormulaParser(x) for x in self.FORMULAS])
+        solver = knowledge_base.horn_solver()
+        # negation of query adds facts only till reset, so every order of queries gives the same verdicts
+        for query in list(self.QUERIES) * 2 + list(reversed(list(self.QUERIES))):
+            with self.subTest(query=query):
+                pl_problem = PLLogicProblem(knowledge_base, FormulaParser(query), 0)
+                self.assertEqual(pl_problem.verdict(), self.QUERIES[query])
+                self.assertIs(knowledge_base.horn_solver(), solver)
+
+    def test_reset(self):
+        solver = HornSolver([[1], [-1, 2], [-2, -3, 4], [-4]])
+        state = (list(solver.counts), dict(solver.reasons), {x: list(y) for x, y in solver.bodies.items()})
+        self.assertTrue(solver.solve())
+        self.assertFalse(solver.solve([[3]]))
+        self.assertEqual(solver.conflict, 3)
+        solver.reset()
+        self.assertEqual((solver.counts, solver.reasons, solver.bodies), state)
+        self.assertIsNone(solver.conflict)
+        self.assertTrue(solver.solve([[-3]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+from incremental import IncrementalKnowledgeBase
+from pl_parser import Parser
+
+
+def resolvents(knowledge_base):
+    return {str(x.resolvent) for x in knowledge_base.retained_resolvents() if x.resolvent is not None}
+
+
+def units(knowledge_base):
+    return {str(x) for x in knowledge_base.units.values()}
+
+
+class IncrementalKnowledgeBaseTest(unittest.TestCase):
+    def test_tell_and_ask(self):
+        knowledge_base = IncrementalKnowledgeBase(["A>B", "B>C"])
+        self.assertEqual(knowledge_base.ask("C").verdict(), "0")
+        knowledge_base.tell("A")
+        self.assertEqual(knowledge_base.ask("C").verdict(), "1")
+        self.assertEqual(units(knowledge_base), {"A", "B", "C"})
+
+    def test_retract_removes_dependent_resolvents(self):
+        knowledge_base = IncrementalKnowledgeBase(["A>B", "B>C", "D>E", "A", "D"])
+        self.assertTrue({"B", "C", "E"} <= resolvents(knowledge_base))
+
+        knowledge_base.retract("A")
+        # B and C depend on A, E does not
+        self.assertEqual(units(knowledge_base), {"D", "E"})
+        self.assertNotIn("B", resolvents(knowledge_base))
+        self.assertNotIn("C", resolvents(knowledge_base))
+        self.assertIn("E", resolvents(knowledge_base))
+        self.assertEqual(knowledge_base.ask("C").verdict(), "0")
+        self.assertEqual(knowledge_base.ask("E").verdict(), "1")
+        self.assertEqual(knowledge_base.ask("A>C").verdict(), "1")
+
+    def test_retract_contradiction(self):
+        knowledge_base = IncrementalKnowledgeBase(["A", "A>B", "!B"])
+        self.assertIsNotNone(knowledge_base.contradiction)
+        self.assertEqual(knowledge_base.ask("Z").verdict(), "1")
+        knowledge_base.retract("!B")
+        self.assertIsNone(knowledge_base.contradiction)
+        self.assertEqual(knowledge_base.ask("Z").verdict(), "0")
+
+    def test_retract_and_tell_again(self):
+        formulas = ["A>B", "B&C>D", "!D|E", "A", "C"]
+        queries = ["B", "D", "E", "!A", "C&E", "Z"]
+        knowledge_base = IncrementalKnowledgeBase(formulas)
+        verdicts = [knowledge_base.ask(x).verdict() for x in queries]
+        before = units(knowledge_base)
+        for formula in formulas:
+            with self.subTest(formula=formula):
+                knowledge_base.retract(formula)
+                knowledge_base.tell(formula)
+                self.assertEqual([knowledge_base.ask(x).verdict() for x in queries], verdicts)
+                self.assertEqual(units(knowledge_base), before)
+
+    def test_random_changes(self):
+        # after every change answers are the same as answers of knowledge base built from scratch
+        rng = random.Random(0)
+        candidates = ["A", "!A", "B", "C", "A>B", "B>C", "C>!A", "A|D", "D>C", "!C|E", "B&E>F"]
+        queries = ["A", "B", "C", "D", "E", "F", "!A"]
+        knowledge_base = IncrementalKnowledgeBase()
+        told = []
+        for _ in range(60):
+            if told and rng.random() < 0.4:
+                formula = rng.choice(told)
+                told.remove(formula)
+                knowledge_base.retract(formula)
+            else:
+                formula = rng.choice([x for x in candidates if x not in told])
+                told.append(formula)
+                knowledge_base.tell(formula)
+            query = rng.choice(queries)
+            expected = Parser([f"{len(told)} 0"] + told + [query]).get_parsed_pl_problem().verdict()
+            self.assertEqual(knowledge_base.ask(query).verdict(), expected, told + [query])
+            fresh = IncrementalKnowledgeBase(told)
+            self.assertEqual(knowledge_base.contradiction is None, fresh.contradiction is None, told)
+            if fresh.contradiction is None:
+                # units of inconsistent knowledge base depend on order in which contradiction was found
+                self.assertEqual(units(knowledge_base), units(fresh), told)
+
+    def test_retract_unknown_formula(self):
+        knowledge_base = IncrementalKnowledgeBase(["A>B"])
+        with self.assertRaisesRegex(Exception, "Knowledge Error"):
+            knowledge_base.retract("B>A")
+        # formulas are compared after parsing
+        knowledge_base.retract(" A > B ")
+        with self.assertRaisesRegex(Exception, "Knowledge Error"):
+            knowledge_base.retract("A>B")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from benchmarks.generators import generate
+from limits import Limits
+from pl_parser import Parser
+
+
+LIMITS = {
+    "time": Limits(time=0),
+    "steps": Limits(steps=1),
+    "clauses": Limits(clauses=1),
+    "memory": Limits(memory=1),
+}
+
+
+def solve(problem, limits):
+    return Parser(problem, limits=limits).get_parsed_pl_problem()
+
+
+class LimitsTest(unittest.TestCase):
+    def test_every_limit_of_every_prover(self):
+        # pigeonhole needs search of every prover, it is not Horn and not 2-CNF
+        self.assertEqual(solve(generate("pigeonhole", 4, 0, "sat"), None).verdict(), "1")
+        for options in ["", "tseitin", "sat", "tseitin sat", "table"]:
+            problem = generate("pigeonhole", 4, 0, options)
+            for name, limits in LIMITS.items():
+                # truth table stores no clauses, so only its time and chunks are limited
+                if options == "table" and name in ["clauses", "memory"]:
+                    continue
+                with self.subTest(options=options, limit=name):
+                    pl_problem = solve(problem, limits)
+                    self.assertEqual(pl_problem.verdict(), "unknown")
+                    self.assertIsNone(pl_problem.is_query_true)
+                    self.assertEqual(pl_problem.limit_reached, name)
+                    # mode 1 prints which limit is reached
+                    count, _, *words = problem[0].split()
+                    pl_problem = solve([" ".join([count, "1"] + words)] + problem[1:], limits)
+                    self.assertIn(f"Limit of {name} is reached", pl_problem.get_result())
+
+    def test_sat_search_without_conflicts(self):
+        # satisfiable problem without any conflict is stopped by decisions and restarts too
+        formulas = [f"A{i}|B{i}|C{i}|Z" for i in range(50)]
+        problem = [f"{len(formulas)} 0 sat"] + formulas + ["Z"]
+        self.assertEqual(solve(problem, None).stats.counters["conflicts"], 0)
+        pl_problem = solve(problem, Limits(time=0))
+        self.assertEqual(pl_problem.verdict(), "unknown")
+        self.assertEqual(pl_problem.limit_reached, "time")
+
+    def test_linear_provers_ignore_limits(self):
+        # forward chaining and implication graph do not search, so they decide query within any limit
+        horn = ["A", "A>B", "B&A>C"]
+        two_sat = ["A|B", "A>C", "B>C"]
+        for formulas in [horn, two_sat]:
+            for name, limits in LIMITS.items():
+                with self.subTest(formulas=formulas, limit=name):
+                    pl_problem = solve([f"{len(formulas)} 0"] + formulas + ["C"], limits)
+                    self.assertEqual(pl_problem.verdict(), "1")
+                    self.assertIsNone(pl_problem.limit_reached)
+
+    def test_limit_not_reached(self):
+        problem = generate("pigeonhole", 3, 0, "")
+        pl_problem = solve(problem, Limits(time=60, steps=10 ** 6, clauses=10 ** 6, memory=10 ** 9))
+        self.assertEqual(pl_problem.verdict(), "1")
+        self.assertIsNone(pl_problem.limit_reached)
+
+
+if __name__ == "__main__":
+    unittest.main()
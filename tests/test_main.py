@@ -0,0 +1,35 @@
+import contextlib
+import io
+import unittest
+
+import main
+from portfolio import Portfolio
+
+
+PROBLEMS = [["1 0", "A&", "A"], ["2 0", "A>B", "A", "B"], ["1 0", "A", "B)"]]
+
+
+def output(function, *args):
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        function(*args)
+    return stdout.getvalue().splitlines()
+
+
+class ErrorTest(unittest.TestCase):
+    EXPECTED = ["Parsing Error: Formula is incomplete", "1", "Parsing Error: Unbalanced parenthesis"]
+
+    def test_sequential(self):
+        self.assertEqual([main.solve(x)[0] for x in PROBLEMS], self.EXPECTED)
+
+    def test_parallel(self):
+        self.assertEqual([x[0] for x in main.solve_in_parallel(PROBLEMS, 2)], self.EXPECTED)
+
+    def test_portfolio(self):
+        # error of every strategy does not stop next problems
+        self.assertEqual(output(main.solve_by_portfolio, PROBLEMS, Portfolio(["resolution", "sat"]), True),
+                         self.EXPECTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
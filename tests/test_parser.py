@@ -0,0 +1,38 @@
+import unittest
+
+from operations import And, Or, Operand
+from pl_parser import FormulaParser
+
+
+class NestedChainTest(unittest.TestCase):
+    """
+    Nested conjunction or disjunction is flattened to one node, however parentheses are placed
+    """
+    SIZE = 2000
+
+    def test_nested_and_flat_chain(self):
+        n = self.SIZE
+        for operator, cls in [("&", And), ("|", Or)]:
+            with self.subTest(operator=operator):
+                flat = operator.join(f"A{i}" for i in range(n))
+                left = "(" * (n - 1) + "A0" + "".join(f"{operator}A{i})" for i in range(1, n))
+                right = "".join(f"A{i}{operator}(" for i in range(n - 1)) + f"A{n - 1}" + ")" * (n - 1)
+
+                formula = FormulaParser(flat).formula
+                self.assertIs(type(formula), cls)
+                self.assertEqual(len(formula.operands), n)
+                self.assertIs(FormulaParser(left).formula, formula)
+                self.assertIs(FormulaParser(right).formula, formula)
+
+    def test_nested_operations(self):
+        a, b, c, d = (Operand(x) for x in "ABCD")
+        self.assertIs(And([And([a, b]), And([c, b]), d]), And([d, c, b, a]))
+        self.assertIs(And([Or([a, b]), And([Or([b, a]), c])]), FormulaParser("C&(B|A)").formula)
+        self.assertIs(And([And([a, a])]), a)
+        # two operands are only compared, order must be the same as order of sorted operands
+        self.assertIs(And([b, a]), And([a, b, a]))
+        self.assertIs(Or([Or([c, d]), a]).operands[0], Or([d, a, c]).operands[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
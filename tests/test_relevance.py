@@ -0,0 +1,52 @@
+import unittest
+
+from clauses import renumber
+from pl_parser import Parser
+from relevance import RelevanceGraph
+
+
+def solve(problem):
+    return Parser(problem).get_parsed_pl_problem()
+
+
+class RelevanceGraphTest(unittest.TestCase):
+    # independent rules which share no symbol with A, B or C
+    INDEPENDENT = [f"X{i}|Y{i}" for i in range(100)]
+
+    def test_slice(self):
+        graph = RelevanceGraph([[1, 2], [3, 4], [-2, 5], [6]])
+        self.assertEqual(graph.slice({5}), [0, 2])
+        self.assertEqual(graph.slice({3, 6}), [1, 3])
+        self.assertEqual(graph.slice({7}), [])
+
+    def test_unsatisfiable_component_is_kept(self):
+        graph = RelevanceGraph([[1, 2], [3], [-3], [4, -5]])
+        self.assertEqual(graph.slice({1}), [0, 1, 2])
+        self.assertIs(graph.is_satisfiable(), False)
+
+    def test_every_prover(self):
+        kb = self.INDEPENDENT + ["A>B"]
+        for options in ["", "tseitin", "sat", "table"]:
+            with self.subTest(options=options):
+                pl_problem = solve([f"{len(kb)} 0 {options}"] + kb + ["!A|B"])
+                self.assertEqual(pl_problem.verdict(), "1")
+                self.assertEqual(pl_problem.stats.counters["irrelevant_clauses"], len(self.INDEPENDENT))
+                self.assertEqual(solve([f"{len(kb)} 0 {options}"] + kb + ["B"]).verdict(), "0")
+
+                # contradiction which shares no symbol with query still proves it
+                contradiction = kb + ["!X0", "!Y0"]
+                self.assertEqual(solve([f"{len(contradiction)} 0 {options}"] + contradiction + ["C"]).verdict(), "1")
+
+    def test_sat_prover_gets_renumbered_slice(self):
+        kb = self.INDEPENDENT + ["A>B"]
+        pl_problem = solve([f"{len(kb)} 0 sat"] + kb + ["C|B"])
+        self.assertEqual(pl_problem.verdict(), "0")
+        # symbols of independent rules are not given to solver, so it decides only symbols of slice
+        self.assertLessEqual(pl_problem.stats.counters["decisions"], 3)
+
+    def test_renumber(self):
+        self.assertEqual(renumber([[5, -9], [9, 12]]), ([[1, -2], [2, 3]], 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from pl_parser import Parser
+
+
+def verdict(problem):
+    return Parser(problem).get_parsed_pl_problem().verdict()
+
+
+class InconsistentKnowledgeBaseTest(unittest.TestCase):
+    """
+    Knowledge base which is a contradiction entails every query, even query whose symbols it does not have
+    """
+    # no unit clause of knowledge base is contradicted by unit propagation alone
+    CLAUSES = ["A|B|D", "A|!B|D", "!A|B|D", "!A|!B|D", "!D"]
+    # contradiction is found only after tseitin clauses of knowledge base are resolved with each other
+    TSEITIN = ["D", "!C", "(!B)=((B)=(D))"]
+
+    def test_every_prover(self):
+        for options in ["", "tseitin", "sat", "table"]:
+            with self.subTest(options=options):
+                self.assertEqual(verdict([f"5 0 {options}"] + self.CLAUSES + ["C"]), "1")
+                self.assertEqual(verdict([f"3 0 {options}"] + self.TSEITIN + ["(!A)=(C)"]), "1")
+
+    def test_proof_ends_with_contradiction(self):
+        result = Parser(["5 1"] + self.CLAUSES + ["C"]).get_parsed_pl_problem().get_result().split("\n")
+        self.assertIn("Contradiction !!", result[-2])
+        self.assertEqual(result[-1], "1")
+
+    def test_consistent_knowledge_base(self):
+        self.assertEqual(verdict(["4 0"] + self.CLAUSES[:4] + ["C"]), "0")
+
+
+if __name__ == "__main__":
+    unittest.main()
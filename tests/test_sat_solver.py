@@ -0,0 +1,103 @@
+import itertools
+import random
+import unittest
+
+from sat_solver import SATSolver
+
+
+def is_satisfiable(clauses, num_of_symbols):
+    # brute force over every assignment
+    for values in itertools.product([False, True], repeat=num_of_symbols):
+        if all(any(values[abs(x) - 1] == (x > 0) for x in clause) for clause in clauses):
+            return True
+    return False
+
+
+def random_cnf(rng, num_of_symbols, num_of_clauses, min_length=1):
+    # clauses of min_length to 3 literals
+    clauses = []
+    for _ in range(num_of_clauses):
+        symbols = rng.sample(range(1, num_of_symbols + 1), rng.randint(min_length, min(3, num_of_symbols)))
+        clauses.append([x if rng.random() < 0.5 else -x for x in symbols])
+    return clauses
+
+
+def pigeonhole(holes):
+    # holes + 1 pigeons in holes, unsatisfiable and needs many conflicts
+    def symbol(p, h):
+        return p * holes + h + 1
+
+    clauses = [[symbol(p, h) for h in range(holes)] for p in range(holes + 1)]
+    for h in range(holes):
+        for p, q in itertools.combinations(range(holes + 1), 2):
+            clauses.append([-symbol(p, h), -symbol(q, h)])
+    return clauses, (holes + 1) * holes
+
+
+def solve(clauses, num_of_symbols):
+    solver = SATSolver(num_of_symbols)
+    for clause in clauses:
+        solver.add_clause(list(clause))
+    return solver, solver.solve()
+
+
+class SATSolverTest(unittest.TestCase):
+    def test_random_cnf(self):
+        rng = random.Random(0)
+        learnt_clauses = 0
+        for _ in range(500):
+            num_of_symbols = rng.randint(1, 8)
+            clauses = random_cnf(rng, num_of_symbols, rng.randint(1, 40))
+            solver, result = solve(clauses, num_of_symbols)
+            self.assertEqual(result, is_satisfiable(clauses, num_of_symbols), clauses)
+            if result:
+                model = solver.model()
+                self.assertTrue(all(any(model[abs(x)] == (x > 0) for x in clause) for clause in clauses))
+            learnt_clauses += solver.learnt_clauses
+        self.assertGreater(learnt_clauses, 0)
+
+    def test_empty_and_unit_clauses(self):
+        self.assertIs(solve([], 2)[1], True)
+        self.assertIs(solve([[]], 2)[1], False)
+        self.assertIs(solve([[1], [-1]], 1)[1], False)
+        self.assertIs(solve([[1, -1]], 1)[1], True)
+
+    def test_learnt_clauses_are_implied(self):
+        rng = random.Random(1)
+        learnt_clauses = 0
+        for _ in range(20):
+            # 3-CNF near phase transition needs search
+            clauses = random_cnf(rng, 10, 43, 3)
+            solver, _ = solve(clauses, 10)
+            # attached clause which is not input clause is learnt, it must follow from input clauses
+            inputs = {frozenset(x) for x in clauses}
+            for clause in solver.clauses:
+                if frozenset(clause) not in inputs:
+                    learnt_clauses += 1
+                    self.assertFalse(is_satisfiable(clauses + [[-x] for x in clause], 10), clause)
+        self.assertGreater(learnt_clauses, 0)
+
+    def test_restarts(self):
+        clauses, num_of_symbols = pigeonhole(5)
+        solver = SATSolver(num_of_symbols)
+        solver.FIRST_RESTART = 2
+        restarts = []
+        solver.progress = lambda: restarts.append(solver.conflicts)
+        for clause in clauses:
+            solver.add_clause(clause)
+        self.assertIs(solver.solve(), False)
+        self.assertGreater(solver.restarts, 1)
+        self.assertEqual(len(restarts), solver.restarts)
+
+    def test_stop(self):
+        clauses, num_of_symbols = pigeonhole(6)
+        solver = SATSolver(num_of_symbols)
+        solver.stop = lambda: solver.conflicts >= 10
+        for clause in clauses:
+            solver.add_clause(clause)
+        self.assertIsNone(solver.solve())
+        self.assertEqual(solver.conflicts, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import unittest
+
+from benchmarks.generators import generate
+from service import Service
+
+
+def handle(lines, timeout=None):
+    # responses of request lines in order, one worker answers them
+    async def run():
+        service = Service(1, timeout)
+        await service.pool.start()
+        try:
+            return [await service.handle(x) for x in lines]
+        finally:
+            service.pool.stop()
+
+    return asyncio.run(run())
+
+
+def request(problem, **kwargs):
+    return json.dumps(dict(id=1, problem=problem, **kwargs))
+
+
+class ServiceTest(unittest.TestCase):
+    def test_good_requests(self):
+        responses = handle([
+            request(["2 0", "A>B", "A", "B"]),
+            request("2 0\nA>B\nA\nC"),
+            request(["2 0 sat", "A>B", "A", "B"], stats=True),
+        ])
+        self.assertEqual(responses[0], {"id": 1, "result": "1"})
+        self.assertEqual(responses[1], {"id": 1, "result": "0"})
+        self.assertEqual(responses[2]["result"], "1")
+        self.assertIn("prove", responses[2]["stats"]["times"])
+
+    def test_malformed_requests(self):
+        cases = [
+            ("{", "Request Error"),
+            ("[1, 2]", "Request Error: request must be JSON object"),
+            (json.dumps({"id": 1}), "Request Error: problem must be text or list of lines"),
+            (request(["2 0", "A>B", "A"]), "Input Error"),
+            (request(["1 0", "A", "B", "1 0", "A", "B"]), "Request Error: request must have exactly one problem"),
+            (request(["1 0", "A&", "B"]), "Parsing Error"),
+            (request(["1 0", "A", "B"], timeout=-1), "Request Error: timeout must be positive number of seconds"),
+        ]
+        responses = handle([line for line, _ in cases] + [request(["1 0", "A", "A"])])
+        for (line, error), response in zip(cases, responses):
+            with self.subTest(line=line):
+                self.assertNotIn("result", response)
+                self.assertTrue(response["error"].startswith(error), response)
+        # worker still answers after wrong requests
+        self.assertEqual(responses[-1], {"id": 1, "result": "1"})
+
+    def test_timeout(self):
+        responses = handle([
+            # prover stops by itself at time limit
+            request(generate("pigeonhole", 6, 0), timeout=0.2),
+            # classic CNF of nested biconditional is exponential and not limited, so worker is killed
+            request(generate("nested_iff", 16, 0), timeout=0.1),
+            request(["2 0", "A>B", "A", "B"]),
+        ])
+        self.assertEqual(responses[0], {"id": 1, "result": "unknown", "limit": "time"})
+        self.assertEqual(responses[1], {"id": 1, "result": "unknown", "limit": "time"})
+        # killed worker is started again
+        self.assertEqual(responses[2], {"id": 1, "result": "1"})
+
+    def test_default_timeout(self):
+        responses = handle([request(generate("pigeonhole", 6, 0))], timeout=0.2)
+        self.assertEqual(responses[0]["limit"], "time")
+
+
+if __name__ == "__main__":
+    unittest.main()
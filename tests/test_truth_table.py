@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from limits import Limits
+from operations import Operand, UnaryOperation, BinaryOperation
+from pl_parser import FormulaParser, Parser
+from truth_table import TruthTable
+
+
+def evaluate(formula, model):
+    if type(formula) is Operand:
+        return model[formula.value]
+    if type(formula) is UnaryOperation:
+        return not evaluate(formula.operand, model)
+    if type(formula) is BinaryOperation:
+        left = evaluate(formula.left_operand, model)
+        right = evaluate(formula.right_operand, model)
+        return (not left or right) if formula.operator == ">" else left == right
+    values = [evaluate(x, model) for x in formula.operands]
+    return all(values) if formula.operator == "&" else any(values)
+
+
+def table(formulas, query):
+    return TruthTable([FormulaParser(x).formula for x in formulas], FormulaParser(query).formula)
+
+
+def symbols(n):
+    return [f"X{i}" for i in range(n)]
+
+
+class TruthTableTest(unittest.TestCase):
+    def test_chunk_boundary(self):
+        # every symbol except those of first chunk doubles number of chunks
+        for n in [15, 16, 17, 18]:
+            with self.subTest(symbols=n):
+                names = symbols(n)
+                tautology = table([], "|".join(names + ["!" + names[-1]]))
+                self.assertIs(tautology.entails(), True)
+                self.assertEqual(tautology.chunks, 1 << max(0, n - TruthTable.CHUNK_BITS))
+
+                # only counter model is the last assignment, every symbol is true
+                last = table([], "!(" + "&".join(names) + ")")
+                self.assertIs(last.entails(), False)
+                self.assertEqual(last.model, {x: True for x in names})
+
+                # counter model where only last symbol is true
+                single = table(["!" + x for x in names[:-1]], "!" + names[-1])
+                self.assertIs(single.entails(), False)
+                self.assertEqual(single.model, {x: x == names[-1] for x in names})
+
+    def test_random_formulas(self):
+        # 18 symbols, so formulas are evaluated in 4 chunks
+        rng = random.Random(0)
+        names = symbols(18)
+        for _ in range(20):
+            formulas = []
+            for _ in range(rng.randint(3, 8)):
+                a, b, c = rng.sample(names, 3)
+                formulas.append(f"({a}{rng.choice('&|>=')}!{b}){rng.choice('|>=')}{c}")
+            query = f"{rng.choice(names)}|!{rng.choice(names)}>{rng.choice(names)}"
+            truth_table = table(formulas, query)
+            result = truth_table.entails()
+            problem = [f"{len(formulas)} 0 sat"] + formulas + [query]
+            self.assertEqual(result, Parser(problem).get_parsed_pl_problem().is_query_true, problem)
+            if not result:
+                model = dict(truth_table.model)
+                self.assertTrue(all(evaluate(FormulaParser(x).formula, model) for x in formulas))
+                self.assertFalse(evaluate(FormulaParser(query).formula, model))
+
+    def test_fallback_to_resolution(self):
+        for n in [TruthTable.MAX_SYMBOLS, TruthTable.MAX_SYMBOLS + 1]:
+            with self.subTest(symbols=n):
+                names = symbols(n)
+                # chain X0>X1>...>Xn-1 proves last symbol from first one
+                formulas = [f"{a}>{b}" for a, b in zip(names, names[1:])] + [names[0]]
+                pl_problem = Parser([f"{len(formulas)} 0 table"] + formulas + [names[-1]]).get_parsed_pl_problem()
+                self.assertEqual(pl_problem.verdict(), "1")
+                if n > TruthTable.MAX_SYMBOLS:
+                    self.assertEqual(pl_problem.stats.counters.get("table_fallbacks"), 1)
+                    self.assertNotIn("table_chunks", pl_problem.stats.counters)
+                else:
+                    self.assertNotIn("table_fallbacks", pl_problem.stats.counters)
+                    self.assertEqual(pl_problem.stats.counters["table_symbols"], n)
+
+    def test_step_limit_counts_chunks(self):
+        names = symbols(20)
+        query = "|".join(names + ["!" + names[-1]])
+        pl_problem = Parser(["0 0 table", query], limits=Limits(steps=3)).get_parsed_pl_problem()
+        self.assertEqual(pl_problem.verdict(), "unknown")
+        self.assertEqual(pl_problem.limit_reached, "steps")
+        self.assertEqual(pl_problem.stats.counters["table_chunks"], 3)
+
+        pl_problem = Parser(["0 0 table", query], limits=Limits(steps=16)).get_parsed_pl_problem()
+        self.assertEqual(pl_problem.verdict(), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
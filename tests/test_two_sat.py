@@ -0,0 +1,70 @@
+import itertools
+import random
+import unittest
+
+from pl_parser import Parser
+from proofs import check_proof
+from two_sat import TwoSATSolver
+
+
+def is_satisfiable(clauses, num_of_symbols):
+    # brute force over every assignment
+    for values in itertools.product([False, True], repeat=num_of_symbols):
+        if all(any(values[abs(x) - 1] == (x > 0) for x in clause) for clause in clauses):
+            return True
+    return False
+
+
+class TwoSATTest(unittest.TestCase):
+    def test_random_2cnf(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            num_of_symbols = rng.randint(1, 6)
+            clauses = []
+            for _ in range(rng.randint(1, 12)):
+                symbols = rng.sample(range(1, num_of_symbols + 1), rng.randint(1, min(2, num_of_symbols)))
+                clauses.append([x if rng.random() < 0.5 else -x for x in symbols])
+            solver = TwoSATSolver(clauses)
+            self.assertEqual(solver.solve(), is_satisfiable(clauses, num_of_symbols), clauses)
+            if solver.conflict is not None:
+                # literal and its complement imply each other
+                self.assertTrue(solver.path(solver.conflict, -solver.conflict))
+                self.assertTrue(solver.path(-solver.conflict, solver.conflict))
+
+    def test_long_chain(self):
+        # X1>X2>...>Xn and Xn>!X1 and X1, components are found without recursion
+        n = 20000
+        clauses = [[-i, i + 1] for i in range(1, n)] + [[-n, -1]]
+        self.assertTrue(TwoSATSolver(clauses).solve())
+        solver = TwoSATSolver(clauses + [[1]])
+        self.assertFalse(solver.solve())
+        self.assertEqual(len(solver.path(1, -1)), n)
+
+    def test_queries(self):
+        # A|B is not Horn, so 2-CNF prover is used
+        formulas = ["A|B", "A>C", "B>C", "C>!E", "E|F"]
+        queries = {"C": "1", "F": "1", "A": "0", "!A": "0", "C&F": "1", "A|B": "1", "E": "0"}
+        for query, expected in queries.items():
+            with self.subTest(query=query):
+                pl_problem = Parser([f"{len(formulas)} 1"] + formulas + [query]).get_parsed_pl_problem()
+                self.assertEqual(pl_problem.verdict(), expected)
+                self.assertIn("implication_edges", pl_problem.stats.counters)
+                check_proof(self, pl_problem)
+
+    def test_random_proofs(self):
+        rng = random.Random(1)
+        symbols = "ABCDE"
+        for _ in range(200):
+            formulas = []
+            for _ in range(rng.randint(2, 8)):
+                a, b = rng.sample(symbols, 2)
+                formulas.append(f"{rng.choice(['', '!'])}{a}|{rng.choice(['', '!'])}{b}")
+            query = rng.choice(["", "!"]) + rng.choice(symbols)
+            pl_problem = Parser([f"{len(formulas)} 1"] + formulas + [query]).get_parsed_pl_problem()
+            expected = Parser([f"{len(formulas)} 0 table"] + formulas + [query]).get_parsed_pl_problem().verdict()
+            self.assertEqual(pl_problem.verdict(), expected, formulas + [query])
+            check_proof(self, pl_problem)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+from operations import Operand, UnaryOperation, BinaryOperation, NaryOperation
+
+
+class TruthTable(object):
+    """
+    Model checking over every assignment of symbols, knowledge base entails query if query is true
+    in every assignment in which knowledge base is true
+    Formulas are compiled to program of bitwise operations on Python integers whose every bit is one assignment,
+    assignments are evaluated in chunks of 2^CHUNK_BITS, so memory does not depend on number of symbols
+    """
+    MAX_SYMBOLS = 25
+    CHUNK_BITS = 16
+
+    # names of symbols, symbol i is bit i of assignment
+    symbols = None
+    # (operator, argument) in order of evaluation, argument is symbol or index (indexes) of earlier operations
+    program = None
+    knowledge_base = None
+    query = None
+
+    # symbol -> value of assignment in which knowledge base is true and query is false
+    model = None
+    # number of evaluated chunks
+    chunks = None
+    # optional function which returns True when checking should stop
+    stop = None
+
+    def __init__(self, knowledge_base, query):
+        # knowledge_base: list of formulas, query: formula
+        self.symbols = []
+        self.program = []
+        self.chunks = 0
+        compiled = {}
+        symbols = {}
+        self.knowledge_base = [self._compile(x, compiled, symbols) for x in knowledge_base]
+        self.query = self._compile(query, compiled, symbols)
+
+    @classmethod
+    def is_small(cls, formulas):
+        # True if formulas have at most MAX_SYMBOLS symbols
+        symbols = set()
+        stack = list(formulas)
+        seen = set()
+        while stack:
+            formula = stack.pop()
+            if id(formula) in seen:
+                continue
+            seen.add(id(formula))
+            if type(formula) is Operand:
+                symbols.add(formula.value)
+                if len(symbols) > cls.MAX_SYMBOLS:
+                    return False
+            else:
+                stack.extend(cls._operands(formula))
+        return True
+
+    def entails(self):
+        # returns True if knowledge base entails query, False with model if it does not, None if stop returned True
+        num_of_bits = min(len(self.symbols), self.CHUNK_BITS)
+        size = 1 << num_of_bits
+        mask = (1 << size) - 1
+
+        # symbol i < num_of_bits is bit i of position in chunk, other symbols have one value in whole chunk
+        columns = []
+        for i in range(num_of_bits):
+            width = 1 << i
+            column = ((1 << width) - 1) << width
+            width *= 2
+            while width < size:
+                column |= column << width
+                width *= 2
+            columns.append(column)
+
+        for chunk in range(1 << (len(self.symbols) - num_of_bits)):
+            if self.stop and self.stop():
+                return None
+            self.chunks += 1
+
+            values = columns + [mask if chunk >> i & 1 else 0 for i in range(len(self.symbols) - num_of_bits)]
+            counter_models = self._evaluate(values, mask)
+            if counter_models:
+                # lowest assignment of chunk
+                position = (counter_models & -counter_models).bit_length() - 1
+                assignment = position | chunk << num_of_bits
+                self.model = {name: bool(assignment >> i & 1) for i, name in enumerate(self.symbols)}
+                return False
+        return True
+
+    def _evaluate(self, values, mask):
+        # returns bits of assignments in which knowledge base is true and query is false
+        results = []
+        for operator, argument in self.program:
+            if operator == "symbol":
+                x = values[argument]
+            elif operator == "!":
+                x = results[argument] ^ mask
+            elif operator == "&":
+                x = mask
+                for i in argument:
+                    x &= results[i]
+            elif operator == "|":
+                x = 0
+                for i in argument:
+                    x |= results[i]
+            elif operator == ">":
+                x = (results[argument[0]] ^ mask) | results[argument[1]]
+            else:
+                x = (results[argument[0]] ^ results[argument[1]]) ^ mask
+            results.append(x)
+
+        ret = results[self.query] ^ mask
+        for i in self.knowledge_base:
+            ret &= results[i]
+            if not ret:
+                break
+        return ret
+
+    @staticmethod
+    def _operands(formula):
+        if type(formula) is UnaryOperation:
+            return [formula.operand]
+        if type(formula) is BinaryOperation:
+            return [formula.left_operand, formula.right_operand]
+        if isinstance(formula, NaryOperation):
+            return list(formula.operands)
+        return []
+
+    def _compile(self, formula, compiled, symbols):
+        # returns index of operation which computes formula, shared sub formulas are computed once
+        # formulas can be deep, so tree is walked with stack instead of recursion
+        stack = [formula]
+        while stack:
+            node = stack[-1]
+            if id(node) in compiled:
+                stack.pop()
+                continue
+            operands = self._operands(node)
+            pending = [x for x in operands if id(x) not in compiled]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+
+            if type(node) is Operand:
+                if node.value not in symbols:
+                    symbols[node.value] = len(self.symbols)
+                    self.symbols.append(node.value)
+                self.program.append(("symbol", symbols[node.value]))
+            elif type(node) is UnaryOperation:
+                self.program.append((node.operator, compiled[id(operands[0])]))
+            else:
+                self.program.append((node.operator, [compiled[id(x)] for x in operands]))
+            compiled[id(node)] = len(self.program) - 1
+        return compiled[id(formula)]
@@ -0,0 +1,101 @@
+from operations import BinaryOperation, UnaryOperation, Operand, create_clause_with_given_symbol, negate
+
+
+class TseitinConverter(object):
+    """
+    Converts formula to CNF (definitional form) by naming every compound sub formula with a fresh symbol
+    Result is linear in formula size and satisfiable if and only if the formula is satisfiable
+    """
+    # fresh symbols can not be written in input, so they never clash with user symbols
+    SYMBOL_PREFIX = "#"
+
+    count = None
+
+    def __init__(self, count=0):
+        # fresh symbols are numbered after count
+        self.count = count
+
+    def new_symbol(self):
+        self.count += 1
+        return Operand(f"{self.SYMBOL_PREFIX}{self.count}")
+
+    def convert(self, formula):
+        clauses = []
+
+        # top level AND is split and every conjunct is asserted on its own
+        # top level OR of conjunct is kept as clause and only its disjuncts are named
+        for conjunct in self._split(formula, "&"):
+            clause = []
+            # A>B is asserted as !A|B
+            if type(conjunct) is BinaryOperation and conjunct.operator == ">":
+                clause.append(negate(self._name(conjunct.left_operand, clauses)))
+                conjunct = conjunct.right_operand
+            clause += [self._name(x, clauses) for x in self._split(conjunct, "|")]
+            # tautology like A|!A is dropped as in classic conversion
+            clause = create_clause_with_given_symbol(clause, "|").optimize()
+            if clause:
+                clauses.append(clause)
+
+        return create_clause_with_given_symbol(clauses, "&")
+
+    @staticmethod
+    def _split(formula, symbol):
+        return formula.segregate(symbol)
+
+    def _name(self, formula, clauses):
+        # returns literal which is equivalent to formula, definitions of named formulas are added to clauses
+        names = {}
+        stack = [formula]
+        while stack:
+            f = stack[-1]
+            if type(f) is Operand:
+                names[id(f)] = f
+                stack.pop()
+                continue
+
+            if type(f) is UnaryOperation:
+                children = [f.operand]
+            elif type(f) is BinaryOperation:
+                children = [f.left_operand, f.right_operand]
+            else:
+                children = list(f.operands)
+
+            # name children first
+            pending = [c for c in children if id(c) not in names]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            if type(f) is UnaryOperation:
+                names[id(f)] = negate(names[id(f.operand)])
+            else:
+                names[id(f)] = self._define(f.operator, [names[id(c)] for c in children], clauses)
+
+        return names[id(formula)]
+
+    def _define(self, operator, operands, clauses):
+        x = self.new_symbol()
+        nx = negate(x)
+        negated = [negate(o) for o in operands]
+
+        # x = (a&b&...)
+        if operator == "&":
+            definition = [[nx, o] for o in operands] + [[x] + negated]
+        # x = (a|b|...)
+        elif operator == "|":
+            definition = [[nx] + operands] + [[x, o] for o in negated]
+        # x = (a>b)
+        elif operator == ">":
+            a, b = operands
+            definition = [[nx, negate(a), b], [x, a], [x, negate(b)]]
+        # x = (a=b)
+        elif operator == "=":
+            a, b = operands
+            definition = [[nx, negate(a), b], [nx, a, negate(b)], [x, a, b], [x, negate(a), negate(b)]]
+        else:
+            raise Exception(f"Conversion Error: unknown operator {operator}")
+
+        for clause in definition:
+            clauses.append(create_clause_with_given_symbol(clause, "|"))
+        return x
@@ -0,0 +1,107 @@
+import collections
+
+
+class TwoSATSolver(object):
+    """
+    Satisfiability of clauses with at most two literals in time linear in their number
+    Clause a|b is edges !a>b and !b>a of implication graph (unit clause a is edge !a>a), clauses are unsatisfiable
+    if and only if some literal and its complement are in the same strongly connected component
+    """
+    clauses = None
+    # literal -> (literal, index of clause) edges of implication graph
+    graph = None
+    # literal -> id of its strongly connected component
+    components = None
+    # literal which is in the same component as its complement, None if clauses are satisfiable
+    conflict = None
+
+    def __init__(self, clauses):
+        # clauses: lists of signed integer literals
+        self.clauses = clauses
+        self.graph = {}
+        for i, literals in enumerate(clauses):
+            a, b = literals if len(literals) == 2 else (literals[0], literals[0])
+            self.graph.setdefault(-a, []).append((b, i))
+            if a != b:
+                self.graph.setdefault(-b, []).append((a, i))
+
+    @staticmethod
+    def is_2cnf(clauses):
+        return all(len(literals) <= 2 for literals in clauses)
+
+    def solve(self):
+        # returns True if clauses are satisfiable
+        self.components = self._strongly_connected_components()
+        for literal, component in self.components.items():
+            if self.components.get(-literal) == component:
+                self.conflict = literal
+                return False
+        return True
+
+    def path(self, start, end):
+        # returns indexes of clauses on shortest path from start to end, both literals are in the same component
+        component = self.components[start]
+        previous = {start: None}
+        queue = collections.deque([start])
+        while end not in previous:
+            literal = queue.popleft()
+            for target, i in self.graph.get(literal, []):
+                if target not in previous and self.components.get(target) == component:
+                    previous[target] = (literal, i)
+                    queue.append(target)
+
+        ret = []
+        literal = end
+        while previous[literal] is not None:
+            literal, i = previous[literal]
+            ret.append(i)
+        ret.reverse()
+        return ret
+
+    def _strongly_connected_components(self):
+        # iterative Tarjan algorithm, recursion would be too deep for long chains of implications
+        graph = self.graph
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        components = {}
+        num_of_components = 0
+
+        for root in graph:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            # literal and position of next edge to visit
+            work = [(root, 0)]
+            while work:
+                literal, i = work[-1]
+                edges = graph.get(literal, [])
+                if i < len(edges):
+                    work[-1] = (literal, i + 1)
+                    target = edges[i][0]
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, 0))
+                    elif target in on_stack:
+                        low[literal] = min(low[literal], index[target])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[literal])
+                # literal is root of component, component is on stack above it
+                if low[literal] == index[literal]:
+                    while True:
+                        x = stack.pop()
+                        on_stack.discard(x)
+                        components[x] = num_of_components
+                        if x == literal:
+                            break
+                    num_of_components += 1
+        return components